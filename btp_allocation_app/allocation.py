@@ -0,0 +1,221 @@
+import numpy as np
+import pandas as pd
+
+from instrumentation import stage
+
+# Rows resolved per block; bounds the temporary boolean match matrix
+BLOCK_ROWS = 65536
+
+
+def faculty_columns(input_df):
+    # Every column after CGPA is a faculty preference column
+    cols = list(input_df.columns)
+    return cols[cols.index("CGPA") + 1:]
+
+
+def _visit(prefs, start, stop, rows=None):
+    # Rows start..stop of prefs in visiting order. With rows (a permutation
+    # of row indices) only that block is gathered, never the whole matrix.
+    return prefs[start:stop] if rows is None else prefs[rows[start:stop]]
+
+
+def cyclic_allocation(prefs, start=0, rows=None):
+    # Student i (in CGPA order) gets the faculty they ranked (i % F + 1);
+    # if no faculty carries that rank, fall back to faculty i % F. Rows are
+    # numbered from start, so a slice of the cohort can be redone alone.
+    # rows, if given, is the order students are visited in (the i-th
+    # student is row rows[i]); the result is in visiting order.
+    n, n_faculties = prefs.shape
+    allocated = np.empty(n, dtype=np.intp)
+    for first in range(0, n, BLOCK_ROWS):
+        stop = min(first + BLOCK_ROWS, n)
+        cycle = np.arange(start + first, start + stop) % n_faculties
+        hit = _visit(prefs, first, stop, rows) == (cycle + 1)[:, None]
+        allocated[first:stop] = np.where(hit.any(axis=1), hit.argmax(axis=1), cycle)
+    return allocated
+
+
+def capacity_limits(n, n_faculties, min_cap=0, max_cap=None):
+    # Per-faculty (min, max) arrays; the default maximum is an even share
+    if max_cap is None:
+        max_cap = -(-n // max(n_faculties, 1))
+    min_cap = np.broadcast_to(np.asarray(min_cap, dtype=np.int64), (n_faculties,))
+    max_cap = np.broadcast_to(np.asarray(max_cap, dtype=np.int64), (n_faculties,))
+    if (min_cap > max_cap).any() or min_cap.sum() > n or max_cap.sum() < n:
+        raise ValueError(
+            f"Infeasible capacities for {n} students: "
+            f"minimums sum to {min_cap.sum()}, maximums to {max_cap.sum()}"
+        )
+    return min_cap, max_cap
+
+
+def preference_order(prefs):
+    # Faculty indices in each student's order of preference (unranked last)
+    return np.argsort(np.where(np.isnan(prefs.astype(float)), np.inf, prefs), axis=1, kind="stable")
+
+
+def assign_seats(prefs, min_cap, max_cap, load, previous=None, settled=0, rows=None):
+    # Seat the rows of prefs in order, each taking their best-ranked faculty
+    # that still has room. load holds the seats already taken by students
+    # ahead of these rows and is updated in place. Once the seats still owed
+    # to faculties below their minimum equal the students left, only those
+    # faculties stay open. If previous (an earlier allocation of the same
+    # rows) is given, the loop stops at the first row past settled where
+    # load matches what the earlier run had: from there on every student
+    # sees the same open faculties and keeps their seat. rows, if given, is
+    # the order the rows are seated in. Returns the seats of the rows that
+    # were seated, in seating order.
+    n = len(prefs)
+    allocated = np.empty(n, dtype=np.intp)
+    owed = int(np.maximum(min_cap - load, 0).sum())
+    is_open = load < max_cap
+    drift = {}
+    if previous is not None and settled <= 0:
+        return allocated[:0]
+    # Choices are sorted in growing chunks so a short re-seat stays cheap
+    chunk_start = chunk_stop = 0
+    for i in range(n):
+        if i == chunk_stop:
+            chunk_start, chunk_stop = i, i + min(max(2 * (chunk_stop - chunk_start), 64), BLOCK_ROWS)
+            choices = preference_order(_visit(prefs, chunk_start, chunk_stop, rows))
+        if owed >= n - i:
+            is_open &= load < min_cap
+        row = choices[i - chunk_start]
+        fac = row[np.argmax(is_open[row])]
+        allocated[i] = fac
+        load[fac] += 1
+        if load[fac] <= min_cap[fac]:
+            owed -= 1
+        if load[fac] >= max_cap[fac]:
+            is_open[fac] = False
+        if previous is not None:
+            # drift[j] = seats of faculty j now minus in the earlier run
+            for j, step in ((fac, 1), (previous[i], -1)):
+                drift[j] = drift.get(j, 0) + step
+                if not drift[j]:
+                    del drift[j]
+            if i + 1 >= settled and not drift:
+                return allocated[:i + 1]
+    return allocated
+
+
+def capacitated_allocation(prefs, min_cap=0, max_cap=None, rows=None):
+    # CGPA-ordered serial dictatorship with per-faculty capacities: each
+    # student (best CGPA first) takes their best-ranked faculty that still
+    # has room. This is the student-optimal stable matching when faculties
+    # rank students by CGPA. rows is the visiting order, as in cyclic_allocation.
+    n, n_faculties = prefs.shape
+    min_cap, max_cap = capacity_limits(n, n_faculties, min_cap, max_cap)
+    return assign_seats(prefs, min_cap, max_cap, np.zeros(n_faculties, dtype=np.int64), rows=rows)
+
+
+ENGINES = {
+    "cyclic": cyclic_allocation,
+    "capacitated": capacitated_allocation,
+}
+
+
+def student_order(cgpa, tie_seed=None):
+    # Highest CGPA first. Without a seed this is the order sort_values gives
+    # _resolve; with one, equal CGPAs are shuffled.
+    if tie_seed is None:
+        return pd.Series(cgpa).sort_values(ascending=False).index.to_numpy()
+    shuffle = np.random.default_rng(tie_seed).random(len(cgpa))
+    return np.lexsort((shuffle, -cgpa.astype(np.float64)))
+
+
+def _resolve(input_df, faculty_cols, engine="cyclic", **options):
+    students = input_df.sort_values(by="CGPA", ascending=False).reset_index(drop=True)
+    prefs = preference_matrix(students, faculty_cols)
+    return students, prefs, ENGINES[engine](prefs, **options)
+
+
+def decimal_cgpa(values):
+    # CGPA is parsed as float32 (see ingestion.compact_dtypes); widening it
+    # directly gives 9.710000038146973 for 9.71. Going through the shortest
+    # decimal text restores the float64 a CSV reader would have produced,
+    # so CSV, XLSX, Parquet and JSON all carry the same value.
+    values = pd.Series(values)
+    if values.dtype == np.float32:
+        values = values.astype(str).astype(np.float64)
+    return values.to_numpy()
+
+
+def _output_frame(students, faculty_cols, allocated):
+    output_df = students[["Roll", "Name", "Email", "CGPA"]].copy()
+    output_df["CGPA"] = decimal_cgpa(output_df["CGPA"])
+    output_df["Allocated"] = np.asarray(faculty_cols, dtype=object)[allocated]
+    return output_df
+
+
+def allocate_students(input_df, faculty_cols, engine="cyclic", **options):
+    students, _, allocated = _resolve(input_df, faculty_cols, engine, **options)
+    return _output_frame(students, faculty_cols, allocated)
+
+
+def satisfaction_metrics(prefs, allocated):
+    # How many students got their 1st, 2nd, ... choice
+    n, n_faculties = prefs.shape
+    ranks = prefs[np.arange(n), allocated].astype(float)
+    ranked = ranks[(ranks >= 1) & (ranks <= n_faculties)].astype(np.int64)
+    students = np.bincount(ranked, minlength=n_faculties + 1)[1:]
+    share = 100 * students / max(n, 1)
+    return pd.DataFrame({
+        "Rank Obtained": np.arange(1, n_faculties + 1),
+        "Students": students,
+        "Share %": share.round(2),
+        "Cumulative %": share.cumsum().round(2),
+    })
+
+
+def preference_histogram(prefs):
+    # counts[j, r - 1] = number of students who ranked faculty j at rank r.
+    # Each block is transposed once and every faculty row is counted with a
+    # single bincount; ranks outside 1..F, NaN and fractional values fall
+    # into spill buckets 0 and F + 1 that are dropped at the end.
+    n, n_faculties = prefs.shape
+    counts = np.zeros((n_faculties, n_faculties + 2), dtype=np.int64)
+    for start in range(0, n, BLOCK_ROWS):
+        block = prefs[start:start + BLOCK_ROWS]
+        if block.dtype.kind == "u":
+            if n_faculties < np.iinfo(block.dtype).max:
+                block = np.minimum(block, block.dtype.type(n_faculties + 1))
+        else:
+            valid = (block >= 1) & (block <= n_faculties)
+            if block.dtype.kind == "f":
+                valid &= block == np.floor(block)
+            block = np.where(valid, block, 0).astype(np.intp)
+        ranks_by_faculty = np.ascontiguousarray(block.T)
+        for j in range(n_faculties):
+            counts[j] += np.bincount(ranks_by_faculty[j], minlength=n_faculties + 2)
+    return counts[:, 1:n_faculties + 1]
+
+
+def preference_matrix(input_df, faculty_cols):
+    prefs = input_df[faculty_cols]
+    if not all(pd.api.types.is_numeric_dtype(t) for t in prefs.dtypes):
+        prefs = prefs.apply(pd.to_numeric, errors="coerce")
+    return prefs.to_numpy()
+
+
+def preference_summary(input_df, faculty_cols):
+    return summary_frame(preference_histogram(preference_matrix(input_df, faculty_cols)), faculty_cols)
+
+
+def summary_frame(counts, faculty_cols):
+    columns = {"Fac": faculty_cols}
+    for pref_rank in range(1, len(faculty_cols) + 1):
+        columns[f"Count Pref {pref_rank}"] = counts[:, pref_rank - 1]
+    return pd.DataFrame(columns)
+
+
+def run_allocation(input_df, engine="cyclic", **options):
+    faculty_cols = faculty_columns(input_df)
+    shape = {"rows": len(input_df), "cols": len(faculty_cols)}
+    with stage("allocation", engine=engine, **shape):
+        students, prefs, allocated = _resolve(input_df, faculty_cols, engine, **options)
+        output_df = _output_frame(students, faculty_cols, allocated)
+    with stage("summary", **shape):
+        pref_counts = preference_summary(input_df, faculty_cols)
+        satisfaction = satisfaction_metrics(prefs, allocated)
+    return output_df, pref_counts, satisfaction
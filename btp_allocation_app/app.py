@@ -1,97 +1,107 @@
 import streamlit as st
-import pandas as pd
-import logging
-from io import BytesIO
+import hashlib
 
-import os
-import logging
+from allocation import faculty_columns, run_allocation
+from export import FORMATS, available_formats, export_frames
+from ingestion import read_allocation_csv
+from instrumentation import setup_logging, stage
+from validation import validate_preferences
 
-# Ensure the 'logs' directory exists
-log_dir = '/Users/rahulray/Downloads/Mtech1stSem/Algorithm/Assignment and project/btp_allocation_app/logs'
-os.makedirs(log_dir, exist_ok=True)  # This will create the folder if it doesn't exist
-
-# Set up logging
-log_file = os.path.join(log_dir, 'app.log')
-logging.basicConfig(
-    filename=log_file,
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
-
-logging.info("Logging is set up successfully.")
-
-logging.basicConfig(
-    filename="logs/app.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
-logger = logging.getLogger()
+# Logs go to $BTP_LOG_DIR (default: logs/ next to this file); set
+# BTP_METRICS_FILE to also keep a Prometheus text file of stage timings
+logger = setup_logging()
 
 st.set_page_config(page_title="BTP/MTP Allocation System", layout="wide")
 st.title("🎓 BTP/MTP Faculty Allocation System")
 
 uploaded_file = st.file_uploader("📂 Upload Input CSV (input_btp_mtp_allocation.csv)", type=["csv"])
 
-def process_allocation(input_df):
+ENGINE_LABELS = {
+    "Cyclic preference (legacy)": "cyclic",
+    "CGPA priority with faculty capacities": "capacitated",
+}
+engine = ENGINE_LABELS[st.radio("⚙️ Allocation engine", list(ENGINE_LABELS), horizontal=True)]
+engine_options = {}
+if engine == "capacitated":
+    cap_min, cap_max = st.columns(2)
+    engine_options["min_cap"] = int(cap_min.number_input("Min students per faculty", min_value=0, value=0))
+    max_cap = int(cap_max.number_input("Max students per faculty (0 = even share)", min_value=0, value=0))
+    engine_options["max_cap"] = max_cap or None
+
+def process_allocation(input_df, engine="cyclic", **options):
     try:
-        cols = list(input_df.columns)
-        cgpa_index = cols.index("CGPA")
-        faculty_cols = cols[cgpa_index + 1:]
-        n_faculties = len(faculty_cols)
-        st.info(f"Detected {n_faculties} faculties: {', '.join(faculty_cols)}")
-        students = input_df.sort_values(by="CGPA", ascending=False).reset_index(drop=True)
-        allocations = []
-        for i, row in students.iterrows():
-            cycle_pref_index = i % n_faculties + 1
-            allocated_fac = None
-            for fac in faculty_cols:
-                if row[fac] == cycle_pref_index:
-                    allocated_fac = fac
-                    break
-            if not allocated_fac:
-                allocated_fac = faculty_cols[i % n_faculties]
-            allocations.append(allocated_fac)
-        output_df = students[["Roll", "Name", "Email", "CGPA"]].copy()
-        output_df["Allocated"] = allocations
-        pref_counts = pd.DataFrame({"Fac": faculty_cols})
-        for pref_rank in range(1, n_faculties + 1):
-            pref_counts[f"Count Pref {pref_rank}"] = [
-                (input_df[fac] == pref_rank).sum() for fac in faculty_cols
-            ]
-        return output_df, pref_counts
+        faculty_cols = faculty_columns(input_df)
+        st.info(f"Detected {len(faculty_cols)} faculties: {', '.join(faculty_cols)}")
+        return run_allocation(input_df, engine, **options)
     except Exception as e:
         logger.error("Error during allocation processing", exc_info=True)
         st.error(f"❌ Error during allocation: {e}")
-        return None, None
+        return None, None, None
 
-def convert_df_to_csv_bytes(df):
-    buffer = BytesIO()
-    df.to_csv(buffer, index=False)
-    buffer.seek(0)
-    return buffer
+# Parsed uploads are cached by content hash so Streamlit reruns don't re-parse
+@st.cache_data(max_entries=4, show_spinner="Parsing upload...")
+def load_upload(digest, _content):
+    with stage("parse", digest=digest[:12], bytes=len(_content)) as info:
+        input_df = read_allocation_csv(_content)
+        info.update(rows=len(input_df), cols=input_df.shape[1])
+    return input_df
 
 if uploaded_file is not None:
     try:
-        input_df = pd.read_csv(uploaded_file)
+        content = uploaded_file.getvalue()
+        digest = hashlib.sha256(content).hexdigest()
+        input_df = load_upload(digest, content)
         st.success("✅ File uploaded successfully!")
-        output_df, fac_pref_df = process_allocation(input_df)
-        if output_df is not None:
-            st.subheader("📊 Allocation Preview")
-            st.dataframe(output_df.head())
-            st.subheader("📈 Faculty Preference Summary")
-            st.dataframe(fac_pref_df.head())
+        with stage("validation", rows=len(input_df), cols=input_df.shape[1]) as info:
+            report = validate_preferences(input_df)
+            info["issues"] = len(report)
+        proceed = report.empty
+        if not proceed:
+            st.error(f"❌ {report['Row'].nunique()} row(s) failed validation ({len(report)} issue(s)).")
+            st.dataframe(report.head(1000), hide_index=True)
             st.download_button(
-                label="⬇️ Download Allocation CSV",
-                data=convert_df_to_csv_bytes(output_df),
-                file_name="output_btp_mtp_allocation.csv",
-                mime="text/csv"
-            )
-            st.download_button(
-                label="⬇️ Download Faculty Preference Count CSV",
-                data=convert_df_to_csv_bytes(fac_pref_df),
-                file_name="fac_preference_count.csv",
+                label="⬇️ Download Validation Report CSV",
+                data=lambda: export_frames((digest, "validation"), {"Validation": report}, "CSV"),
+                file_name="validation_report.csv",
                 mime="text/csv"
             )
+            proceed = st.checkbox("Allocate anyway (invalid rows may change who gets whom)")
+        output_df = None
+        if proceed:
+            output_df, fac_pref_df, satisfaction_df = process_allocation(input_df, engine, **engine_options)
+        if output_df is not None:
+            preview_col, satisfaction_col = st.columns([3, 2])
+            with preview_col:
+                st.subheader("📊 Allocation Preview")
+                st.dataframe(output_df.head())
+            with satisfaction_col:
+                st.subheader("🎯 Student Satisfaction")
+                mean_rank = (satisfaction_df["Rank Obtained"] * satisfaction_df["Students"]).sum() / max(satisfaction_df["Students"].sum(), 1)
+                top_choice = satisfaction_df["Share %"].iloc[0]
+                st.caption(f"Mean preference rank obtained: {mean_rank:.2f} · first choice: {top_choice:.1f}%")
+                st.dataframe(satisfaction_df[satisfaction_df["Students"] > 0], hide_index=True)
+            st.subheader("📈 Faculty Preference Summary")
+            st.dataframe(fac_pref_df.head())
+            # Files are only serialized when a download button is clicked and
+            # are cached per upload and engine settings
+            export_format = st.radio("💾 Download format", available_formats(), horizontal=True)
+            spec = FORMATS[export_format]
+            run_key = (digest, engine, tuple(sorted(engine_options.items())))
+            if spec.multi_sheet:
+                sheets = {"Allocation": output_df, "Faculty Preferences": fac_pref_df, "Satisfaction": satisfaction_df}
+                downloads = [("Allocation Workbook", "output_btp_mtp_allocation", sheets)]
+            else:
+                downloads = [
+                    ("Allocation", "output_btp_mtp_allocation", {"Allocation": output_df}),
+                    ("Faculty Preference Count", "fac_preference_count", {"Faculty Preferences": fac_pref_df}),
+                ]
+            for label, stem, frames in downloads:
+                st.download_button(
+                    label=f"⬇️ Download {label} ({spec.extension.upper()})",
+                    data=lambda frames=frames: export_frames(run_key, frames, export_format),
+                    file_name=f"{stem}.{spec.extension}",
+                    mime=spec.mime
+                )
     except Exception as e:
         logger.error("Error while reading uploaded file", exc_info=True)
         st.error(f"❌ Failed to process uploaded file: {e}")
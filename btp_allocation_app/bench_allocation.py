@@ -0,0 +1,213 @@
+"""
+Benchmark harness for the allocation pipeline on synthetic preference
+matrices.
+
+    python bench_allocation.py --students 1000 100000 --faculties 18 50 --save base.json
+    python bench_allocation.py --students 1000 100000 --faculties 18 50 --compare base.json
+
+Each student gets a random permutation of 1..F as preferences and a CGPA
+drawn from --cgpa (rounded to --decimals, so coarse rounding gives ties).
+Ingestion (CSV bytes to compact frame), allocation (once per --engines
+entry) and the faculty preference summary are timed separately; the best
+of --repeat runs is kept and one extra traced run records peak memory.
+A measurement slower (or hungrier) than the baseline by more than
+--threshold is flagged as a regression and the exit code is 1; changes
+smaller than --min-seconds / --min-mb are treated as noise. The old
+row-by-row loop is also checked against the cyclic engine for cohorts up
+to --legacy-max students.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from allocation import ENGINES, allocate_students, faculty_columns, preference_summary
+from ingestion import read_allocation_csv
+
+STAGES = ("ingestion", "allocation", "summary")
+CGPA_DISTRIBUTIONS = ("uniform", "normal", "skewed")
+# Smallest absolute change per metric that can count as a regression
+MIN_DELTA = {"seconds": 0.05, "peak_mb": 1.0}
+
+
+def synthetic_cgpa(rng, n_students, distribution="uniform", decimals=2):
+    # uniform: 5..10; normal: mean 7.5, sd 1; skewed: most students near 10
+    if distribution == "uniform":
+        cgpa = rng.uniform(5, 10, n_students)
+    elif distribution == "normal":
+        cgpa = rng.normal(7.5, 1.0, n_students)
+    elif distribution == "skewed":
+        cgpa = 10 - rng.gamma(2.0, 0.6, n_students)
+    else:
+        raise ValueError(f"unknown CGPA distribution {distribution!r}")
+    return cgpa.clip(4, 10).round(decimals)
+
+
+def synthetic_preferences(n_students, n_faculties, cgpa="uniform", decimals=2, seed=0):
+    # One random permutation of 1..F per row, generated in blocks to cap memory
+    rng = np.random.default_rng(seed)
+    dtype = np.uint8 if n_faculties < 256 else np.uint16
+    prefs = np.empty((n_students, n_faculties), dtype=dtype)
+    for start in range(0, n_students, 65536):
+        stop = min(start + 65536, n_students)
+        prefs[start:stop] = np.argsort(rng.random((stop - start, n_faculties)), axis=1) + 1
+    faculty_cols = [f"F{j + 1}" for j in range(n_faculties)]
+    df = pd.DataFrame(prefs, columns=faculty_cols)
+    df.insert(0, "CGPA", synthetic_cgpa(rng, n_students, cgpa, decimals))
+    df.insert(0, "Email", [f"s{i}@example.com" for i in range(n_students)])
+    df.insert(0, "Name", [f"Student {i}" for i in range(n_students)])
+    df.insert(0, "Roll", [f"R{i:07d}" for i in range(n_students)])
+    return df
+
+
+def legacy_allocation(input_df):
+    # The original iterrows implementation, kept for timing and output checks
+    cols = list(input_df.columns)
+    faculty_cols = cols[cols.index("CGPA") + 1:]
+    n_faculties = len(faculty_cols)
+    students = input_df.sort_values(by="CGPA", ascending=False).reset_index(drop=True)
+    allocations = []
+    for i, row in students.iterrows():
+        cycle_pref_index = i % n_faculties + 1
+        allocated_fac = None
+        for fac in faculty_cols:
+            if row[fac] == cycle_pref_index:
+                allocated_fac = fac
+                break
+        if not allocated_fac:
+            allocated_fac = faculty_cols[i % n_faculties]
+        allocations.append(allocated_fac)
+    return allocations
+
+
+def measure(run, repeat):
+    # Best wall time over `repeat` runs and peak traced memory of one more run
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": min(times), "peak_mb": peak / 2**20}
+
+
+def compare(results, baseline, threshold, min_delta=MIN_DELTA):
+    # One message per measurement worse than the baseline by more than
+    # `threshold` (relative) and by at least min_delta[metric] (absolute)
+    key = lambda r: (r["stage"], r["engine"], r["students"], r["faculties"])
+    base = {key(r): r for r in baseline}
+    regressions = []
+    for r in results:
+        old = base.get(key(r))
+        if old is None:
+            continue
+        for metric in ("seconds", "peak_mb"):
+            delta = r[metric] - old[metric]
+            if delta > old[metric] * threshold and delta >= min_delta[metric]:
+                regressions.append(
+                    f"{r['stage']}/{r['engine']} n={r['students']} f={r['faculties']}: "
+                    f"{metric} {old[metric]:.3f} -> {r[metric]:.3f}"
+                )
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the allocation pipeline.")
+    parser.add_argument("--students", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--faculties", type=int, nargs="+", default=[18, 50, 200])
+    parser.add_argument("--engines", nargs="+", choices=sorted(ENGINES), default=sorted(ENGINES))
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--max-cap", type=int, default=None, help="capacitated engine cap (default: even share)")
+    parser.add_argument("--cgpa", choices=CGPA_DISTRIBUTIONS, default="uniform")
+    parser.add_argument("--decimals", type=int, default=2, help="CGPA rounding; fewer decimals, more ties")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--legacy-max", type=int, default=10000)
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown, 0.2 = 20%%")
+    parser.add_argument("--min-seconds", type=float, default=MIN_DELTA["seconds"], help="ignore smaller slowdowns")
+    parser.add_argument("--min-mb", type=float, default=MIN_DELTA["peak_mb"], help="ignore smaller memory growth")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    engine_options = {"capacitated": {"max_cap": args.max_cap}}
+    results = []
+    print(f"{'stage':<11}{'engine':<13}{'students':>9}{'faculties':>10}{'seconds':>10}{'peak MB':>9}  legacy")
+    for n_faculties in args.faculties:
+        for n_students in args.students:
+            generated = synthetic_preferences(n_students, n_faculties, args.cgpa, args.decimals, args.seed)
+            content = generated.to_csv(index=False).encode("utf-8")
+            del generated
+            input_df = read_allocation_csv(content)
+            faculty_cols = faculty_columns(input_df)
+
+            runs = []
+            if "ingestion" in args.stages:
+                runs.append(("ingestion", "-", lambda: read_allocation_csv(content)))
+            if "allocation" in args.stages:
+                for engine in args.engines:
+                    options = engine_options.get(engine, {})
+                    runs.append((
+                        "allocation", engine,
+                        lambda engine=engine, options=options: allocate_students(input_df, faculty_cols, engine, **options),
+                    ))
+            if "summary" in args.stages:
+                runs.append(("summary", "-", lambda: preference_summary(input_df, faculty_cols)))
+
+            for stage, engine, run in runs:
+                row = {"stage": stage, "engine": engine, "students": n_students, "faculties": n_faculties}
+                row.update(measure(run, args.repeat))
+                legacy = "-"
+                if engine == "cyclic" and n_students <= args.legacy_max:
+                    start = time.perf_counter()
+                    expected = legacy_allocation(input_df)
+                    row["legacy_seconds"] = time.perf_counter() - start
+                    same = run()["Allocated"].tolist() == expected
+                    legacy = f"{row['legacy_seconds']:.3f}s same={same}"
+                results.append(row)
+                print(
+                    f"{stage:<11}{engine:<13}{n_students:>9}{n_faculties:>10}"
+                    f"{row['seconds']:>10.3f}{row['peak_mb']:>9.1f}  {legacy}"
+                )
+
+    if args.save:
+        payload = {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cgpa": args.cgpa,
+            "decimals": args.decimals,
+            "results": results,
+        }
+        with open(args.save, "w") as fh:
+            json.dump(payload, fh, indent=2)
+
+    if args.compare:
+        with open(args.compare) as fh:
+            regressions = compare(
+                results, json.load(fh)["results"], args.threshold,
+                {"seconds": args.min_seconds, "peak_mb": args.min_mb},
+            )
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+import threading
+from collections import OrderedDict, namedtuple
+from importlib.util import find_spec
+from io import BytesIO, StringIO
+
+from instrumentation import stage
+
+# Optional writers; formats whose library is missing are not offered
+HAVE_XLSXWRITER = find_spec("xlsxwriter") is not None
+HAVE_PYARROW = find_spec("pyarrow") is not None
+
+# Rows formatted per CSV/XLSX chunk
+EXPORT_CHUNK_ROWS = 50_000
+
+# Finished exports kept in memory, most recently used last
+MAX_CACHED_EXPORTS = 8
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def iter_csv(df, chunk_rows=EXPORT_CHUNK_ROWS):
+    # Encode the CSV chunk_rows rows at a time, yielding UTF-8 bytes per
+    # chunk, so pandas never formats the whole frame into one string
+    for start in range(0, max(len(df), 1), chunk_rows):
+        text = StringIO()
+        df.iloc[start:start + chunk_rows].to_csv(text, index=False, header=start == 0)
+        yield text.getvalue().encode("utf-8")
+
+
+def csv_bytes(frames):
+    # Download buttons take a single bytes payload, so the encoded chunks
+    # are joined here; only the intermediate text is kept small
+    return b"".join(iter_csv(next(iter(frames.values()))))
+
+
+def xlsx_bytes(frames):
+    # One sheet per frame. xlsxwriter's constant_memory mode flushes each row
+    # to disk once the next one starts, so rows are written strictly in order
+    # (pandas' to_excel writes column by column, which that mode cannot take).
+    import xlsxwriter
+
+    buffer = BytesIO()
+    with xlsxwriter.Workbook(buffer, {"constant_memory": True, "nan_inf_to_errors": True}) as workbook:
+        bold = workbook.add_format({"bold": True})
+        for sheet, df in frames.items():
+            worksheet = workbook.add_worksheet(sheet[:31])
+            worksheet.write_row(0, 0, [str(c) for c in df.columns], bold)
+            row = 1
+            for start in range(0, len(df), EXPORT_CHUNK_ROWS):
+                for values in df.iloc[start:start + EXPORT_CHUNK_ROWS].itertuples(index=False, name=None):
+                    worksheet.write_row(row, 0, values)
+                    row += 1
+    return buffer.getvalue()
+
+
+def parquet_bytes(frames):
+    buffer = BytesIO()
+    next(iter(frames.values())).to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+
+# writer(frames) -> bytes; multi_sheet writers get every frame, the others
+# only the first; available is False when the writer's library is missing
+ExportFormat = namedtuple("ExportFormat", "extension mime writer multi_sheet available")
+
+FORMATS = {
+    "CSV": ExportFormat("csv", "text/csv", csv_bytes, multi_sheet=False, available=True),
+    "Excel (XLSX)": ExportFormat(
+        "xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        xlsx_bytes, multi_sheet=True, available=HAVE_XLSXWRITER,
+    ),
+    "Parquet": ExportFormat(
+        "parquet", "application/vnd.apache.parquet",
+        parquet_bytes, multi_sheet=False, available=HAVE_PYARROW,
+    ),
+}
+
+
+def available_formats():
+    return [label for label, spec in FORMATS.items() if spec.available]
+
+
+def cached_export(key, build):
+    # Run build() once per key and keep the bytes for later downloads. Keys
+    # carry the upload hash, so a new upload never reuses an old export.
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    data = build()
+    with _cache_lock:
+        _cache[key] = data
+        while len(_cache) > MAX_CACHED_EXPORTS:
+            _cache.popitem(last=False)
+    return data
+
+
+def export_frames(key, frames, fmt):
+    # Serialize frames ({name: DataFrame}) in the given format; single-sheet
+    # formats only take the first frame.
+    writer = FORMATS[fmt].writer
+
+    def build():
+        rows = sum(len(df) for df in frames.values())
+        with stage("export", format=fmt, sheets=len(frames), rows=rows) as info:
+            data = writer(frames)
+            info["bytes"] = len(data)
+        return data
+
+    return cached_export((key, fmt, tuple(frames)), build)
@@ -0,0 +1,181 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from allocation import (
+    ENGINES,
+    assign_seats,
+    capacity_limits,
+    cyclic_allocation,
+    decimal_cgpa,
+    faculty_columns,
+    preference_histogram,
+    preference_matrix,
+    satisfaction_metrics,
+    student_order,
+    summary_frame,
+)
+
+DIFF_COLUMNS = ["Roll", "Previous", "Allocated"]
+
+
+@dataclass
+class AllocationState:
+    # A finished run that can be corrected in place. Arrays indexed by
+    # position are in CGPA order (position 0 = best CGPA); info and
+    # roll_index keep the upload order.
+    faculty_cols: list
+    engine: str
+    options: dict
+    info: pd.DataFrame
+    roll_index: pd.Index
+    order: np.ndarray      # upload row at each position
+    position: np.ndarray   # position of each upload row
+    cgpa: np.ndarray
+    prefs: np.ndarray
+    allocated: np.ndarray
+    counts: np.ndarray     # preference_histogram(prefs)
+
+
+def build_state(input_df, engine="cyclic", **options):
+    # Same allocation as run_allocation, kept in a form apply_updates can patch
+    faculty_cols = faculty_columns(input_df)
+    info = input_df[["Roll", "Name", "Email"]].reset_index(drop=True)
+    roll_index = pd.Index(info["Roll"])
+    if not roll_index.is_unique:
+        raise ValueError("Roll numbers must be unique for incremental updates")
+    roll_index.get_indexer(roll_index[:1])  # build the lookup table now, not on the first update
+    cgpa = pd.to_numeric(input_df["CGPA"], errors="coerce").to_numpy()
+    if cgpa.dtype.kind != "f":
+        cgpa = cgpa.astype(np.float64)
+    order = np.array(student_order(cgpa))
+    prefs = preference_matrix(input_df, faculty_cols)[order]
+    if engine == "capacitated":
+        min_cap, max_cap = capacity_limits(len(prefs), len(faculty_cols), **options)
+        options = {"min_cap": min_cap, "max_cap": max_cap}
+    position = np.empty_like(order)
+    position[order] = np.arange(len(order))
+    return AllocationState(
+        faculty_cols=faculty_cols, engine=engine, options=options, info=info, roll_index=roll_index,
+        order=order, position=position, cgpa=cgpa[order], prefs=prefs,
+        allocated=ENGINES[engine](prefs, **options), counts=preference_histogram(prefs),
+    )
+
+
+def _target_position(cgpa, pos, value):
+    # Where the student at pos lands with a new CGPA: after everyone with an
+    # equal or higher CGPA (NaN sorts last). Binary search on the descending
+    # array, so only O(log n) elements are read.
+    n = len(cgpa)
+    if np.isnan(value):
+        return n - 1
+    lo, hi = 0, n
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if cgpa[mid] >= value:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo - 1 if pos < lo else lo
+
+
+def _move(state, pos, target):
+    # Shift the rows between pos and target by one and put pos at target.
+    # The old seat travels with the student until allocations are redone.
+    if target == pos:
+        return
+    if target < pos:
+        src, dst = slice(target, pos), slice(target + 1, pos + 1)
+    else:
+        src, dst = slice(pos + 1, target + 1), slice(pos, target)
+    for array in (state.order, state.cgpa, state.prefs, state.allocated):
+        item = array[pos].copy()
+        array[dst] = array[src]
+        array[target] = item
+    first, last = min(pos, target), max(pos, target) + 1
+    state.position[state.order[first:last]] = np.arange(first, last)
+
+
+def _count(state, pos, sign):
+    # Add (sign=1) or remove (sign=-1) one student's ranks from the histogram
+    n_faculties = len(state.faculty_cols)
+    ranks = state.prefs[pos].astype(np.float64)
+    valid = (ranks >= 1) & (ranks <= n_faculties) & (ranks == np.floor(ranks))
+    np.add.at(state.counts, (np.flatnonzero(valid), ranks[valid].astype(np.intp) - 1), sign)
+
+
+def _check_ranks(values, dtype):
+    if dtype.kind in "iu":
+        limits = np.iinfo(dtype)
+        if not all(float(v).is_integer() and limits.min <= v <= limits.max for v in values):
+            raise ValueError(f"preference ranks must be whole numbers that fit {dtype.name}")
+
+
+def apply_updates(state, updates):
+    # Apply a batch of corrections to state in place and return who moved:
+    # one row per student whose faculty changed (Roll, Previous, Allocated).
+    # updates is a DataFrame or a list of dicts with a Roll plus any of
+    # CGPA and the faculty columns; missing or NaN values stay as they are.
+    # Only the positions between a student's old and new place are redone
+    # for the cyclic engine; the capacitated engine re-seats from the first
+    # touched position until faculty loads match the previous run again.
+    # A student whose CGPA changes goes after everyone with an equal CGPA,
+    # which a full re-run may order differently.
+    records = updates.to_dict("records") if isinstance(updates, pd.DataFrame) else list(updates)
+    if not records:
+        return pd.DataFrame(columns=DIFF_COLUMNS)
+    rows = state.roll_index.get_indexer([record["Roll"] for record in records])
+    if (rows < 0).any():
+        unknown = [record["Roll"] for record, row in zip(records, rows) if row < 0]
+        raise ValueError(f"Unknown roll number(s): {', '.join(map(str, unknown))}")
+    column_of = {fac: j for j, fac in enumerate(state.faculty_cols)}
+
+    lo, hi = len(state.order), 0
+    for row, record in zip(rows, records):
+        unknown = set(record) - set(column_of) - {"Roll", "CGPA"}
+        if unknown:
+            raise ValueError(f"Unknown column(s) in update: {', '.join(sorted(map(str, unknown)))}")
+        pos = target = state.position[row]
+        if "CGPA" in record and not pd.isna(record["CGPA"]):
+            value = state.cgpa.dtype.type(record["CGPA"])
+            target = _target_position(state.cgpa, pos, value)
+            _move(state, pos, target)
+            state.cgpa[target] = value
+        changes = {column_of[k]: v for k, v in record.items() if k in column_of and not pd.isna(v)}
+        if changes:
+            _check_ranks(changes.values(), state.prefs.dtype)
+            _count(state, target, -1)
+            state.prefs[target, list(changes)] = list(changes.values())
+            _count(state, target, 1)
+        lo, hi = min(lo, pos, target), max(hi, pos + 1, target + 1)
+
+    if lo >= hi:
+        return pd.DataFrame(columns=DIFF_COLUMNS)
+    if state.engine == "cyclic":
+        seats = cyclic_allocation(state.prefs[lo:hi], start=lo)
+    else:
+        load = np.bincount(state.allocated[:lo], minlength=len(state.faculty_cols)).astype(np.int64)
+        seats = assign_seats(
+            state.prefs[lo:], state.options["min_cap"], state.options["max_cap"], load,
+            previous=state.allocated[lo:], settled=hi - lo,
+        )
+    stop = lo + len(seats)
+    changed = np.flatnonzero(seats != state.allocated[lo:stop])
+    names = np.asarray(state.faculty_cols, dtype=object)
+    diff = pd.DataFrame({
+        "Roll": state.info["Roll"].iloc[state.order[lo + changed]].to_numpy(),
+        "Previous": names[state.allocated[lo + changed]],
+        "Allocated": names[seats[changed]],
+    })
+    state.allocated[lo:stop] = seats
+    return diff
+
+
+def state_frames(state):
+    # The (output_df, pref_counts, satisfaction) triple run_allocation returns
+    output_df = state.info.iloc[state.order].reset_index(drop=True)
+    output_df["CGPA"] = decimal_cgpa(state.cgpa)
+    output_df["Allocated"] = np.asarray(state.faculty_cols, dtype=object)[state.allocated]
+    pref_counts = summary_frame(state.counts, state.faculty_cols)
+    return output_df, pref_counts, satisfaction_metrics(state.prefs, state.allocated)
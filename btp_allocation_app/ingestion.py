@@ -0,0 +1,62 @@
+from importlib.util import find_spec
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+# pyarrow's multi-threaded CSV reader is used when it is installed
+HAVE_PYARROW = find_spec("pyarrow") is not None
+
+# Rows parsed per chunk by the C engine before downcasting
+CHUNK_ROWS = 100_000
+
+
+def compact_dtypes(columns):
+    # Preferences go into the smallest unsigned int that holds 1..F
+    # (uint8 up to 255 faculties) and CGPA into float32.
+    cols = list(columns)
+    faculty_cols = cols[cols.index("CGPA") + 1:]
+    pref_dtype = np.min_scalar_type(max(len(faculty_cols), 1))
+    dtypes = {fac: pref_dtype for fac in faculty_cols}
+    dtypes["CGPA"] = np.float32
+    return dtypes
+
+
+def _downcast(frame, dtypes):
+    # pandas casts out-of-range ints silently (-1 -> 255), so every column
+    # is range-checked before it is narrowed.
+    for col, dt in dtypes.items():
+        values = frame[col]
+        if values.dtype == dt:
+            continue
+        if np.issubdtype(dt, np.integer):
+            limits = np.iinfo(dt)
+            if not pd.api.types.is_integer_dtype(values) or values.min() < limits.min or values.max() > limits.max:
+                raise ValueError(f"column {col!r} does not fit {np.dtype(dt).name}")
+        frame[col] = values.astype(dt)
+    return frame
+
+
+def read_allocation_csv(source, engine=None):
+    # Parse an allocation upload into compact dtypes. The C engine reads in
+    # chunks that are narrowed as they arrive, so peak memory stays at one
+    # wide chunk; engine="pyarrow" (the default when installed) parses the
+    # whole file multi-threaded first. Files whose preferences don't fit
+    # (blanks, text, negative or huge ranks) are re-read with inferred
+    # dtypes so validation can report the bad rows.
+    data = source if isinstance(source, bytes) else source.read()
+    columns = pd.read_csv(BytesIO(data), nrows=0).columns
+    if "CGPA" not in columns:
+        return pd.read_csv(BytesIO(data))
+    dtypes = compact_dtypes(columns)
+    engine = engine or ("pyarrow" if HAVE_PYARROW else "c")
+    try:
+        if engine == "pyarrow":
+            return _downcast(pd.read_csv(BytesIO(data), engine="pyarrow"), dtypes)
+        chunks = [
+            _downcast(chunk, dtypes)
+            for chunk in pd.read_csv(BytesIO(data), chunksize=CHUNK_ROWS)
+        ]
+        return pd.concat(chunks, ignore_index=True)
+    except (ValueError, OverflowError, TypeError):
+        return pd.read_csv(BytesIO(data))
@@ -0,0 +1,150 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# Environment overrides; the defaults suit both a checkout and the Docker image
+LOG_DIR_ENV = "BTP_LOG_DIR"
+LOG_LEVEL_ENV = "BTP_LOG_LEVEL"
+METRICS_FILE_ENV = "BTP_METRICS_FILE"
+DEFAULT_LOG_DIR = Path(__file__).resolve().parent / "logs"
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+logger = logging.getLogger("btp_allocation")
+
+_listener = None
+_setup_lock = threading.Lock()
+
+
+def _rss_bytes():
+    # Current resident set size; 0 where /proc is not available
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def _peak_rss_bytes():
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 if resource else 0
+
+
+class PrometheusFileHandler(logging.Handler):
+    # Aggregates stage records and rewrites a Prometheus text-format file
+    # after each one (node_exporter's textfile collector or any scraper can
+    # read it). Runs on the queue listener thread, never on a request.
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = Path(path)
+        self.stages = {}
+
+    def emit(self, record):
+        info = getattr(record, "stage", None)
+        if info is None:
+            return
+        try:
+            totals = self.stages.setdefault(info["stage"], {
+                "runs": 0, "failures": 0, "seconds": 0.0, "rows": 0, "last": 0.0, "max": 0.0,
+            })
+            totals["runs"] += 1
+            totals["failures"] += not info["ok"]
+            totals["seconds"] += info["seconds"]
+            totals["rows"] += info.get("rows") or 0
+            totals["last"] = info["seconds"]
+            totals["max"] = max(totals["max"], info["seconds"])
+            self._write(info.get("peak_rss_mb", 0) * 2**20)
+        except Exception:
+            self.handleError(record)
+
+    def _write(self, peak_rss):
+        metrics = (
+            ("btp_stage_runs_total", "counter", "Completed runs of a stage", "runs"),
+            ("btp_stage_failures_total", "counter", "Runs of a stage that raised", "failures"),
+            ("btp_stage_seconds_total", "counter", "Wall time spent in a stage", "seconds"),
+            ("btp_stage_rows_total", "counter", "Rows handled by a stage", "rows"),
+            ("btp_stage_last_seconds", "gauge", "Wall time of the latest run", "last"),
+            ("btp_stage_max_seconds", "gauge", "Slowest run so far", "max"),
+        )
+        lines = []
+        for name, kind, help_text, key in metrics:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            lines += [f'{name}{{stage="{stage}"}} {totals[key]}' for stage, totals in sorted(self.stages.items())]
+        lines += [
+            "# HELP btp_process_peak_rss_bytes Peak resident memory of the app process",
+            "# TYPE btp_process_peak_rss_bytes gauge",
+            f"btp_process_peak_rss_bytes {int(peak_rss)}",
+        ]
+        # Write then rename so a scraper never reads half a file
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text("\n".join(lines) + "\n")
+        os.replace(tmp, self.path)
+
+
+def setup_logging(log_dir=None, level=None, metrics_file=None):
+    # Configure the app logger once per process (Streamlit re-runs app.py
+    # but keeps imported modules). Callers only enqueue records; a listener
+    # thread does the file I/O. Arguments fall back to BTP_LOG_DIR,
+    # BTP_LOG_LEVEL and BTP_METRICS_FILE; no metrics file is written unless
+    # one is configured.
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            return logger
+        log_dir = Path(log_dir or os.environ.get(LOG_DIR_ENV) or DEFAULT_LOG_DIR)
+        log_dir.mkdir(parents=True, exist_ok=True)
+        file_handler = logging.FileHandler(log_dir / "app.log")
+        file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        handlers = [file_handler]
+        metrics_file = metrics_file or os.environ.get(METRICS_FILE_ENV)
+        if metrics_file:
+            Path(metrics_file).parent.mkdir(parents=True, exist_ok=True)
+            handlers.append(PrometheusFileHandler(metrics_file))
+
+        records = queue.SimpleQueue()
+        logger.addHandler(logging.handlers.QueueHandler(records))
+        logger.setLevel(level or os.environ.get(LOG_LEVEL_ENV, "INFO").upper())
+        logger.propagate = False
+        _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+        logger.info("Logging to %s", log_dir / "app.log")
+        return logger
+
+
+@contextmanager
+def stage(name, **fields):
+    # Time a pipeline stage and log one JSON record for it:
+    #   with stage("parse", bytes=len(content)) as info:
+    #       df = ...
+    #       info.update(rows=len(df), cols=df.shape[1])
+    # The record carries wall time, resident memory before/after and the
+    # process peak; failed stages are logged with ok=false and re-raised.
+    info = {"stage": name, **fields}
+    rss_before = _rss_bytes()
+    start = time.perf_counter()
+    info["ok"] = False
+    try:
+        yield info
+        info["ok"] = True
+    finally:
+        rss_after = _rss_bytes()
+        info["seconds"] = round(time.perf_counter() - start, 6)
+        info["rss_mb"] = round(rss_after / 2**20, 1)
+        info["rss_delta_mb"] = round((rss_after - rss_before) / 2**20, 1)
+        info["peak_rss_mb"] = round(max(_peak_rss_bytes(), rss_after) / 2**20, 1)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("stage %s", json.dumps(info, default=str), extra={"stage": info})
@@ -0,0 +1,103 @@
+"""
+Local load generator for service.py.
+
+    python service.py --port 8765 --quiet &
+    python loadgen.py --url http://127.0.0.1:8765 --concurrency 8 --requests 200 \\
+        --jobs-per-request 4 --students 500 --faculties 18
+
+Every client thread posts batches of synthetic allocation jobs, reads the
+NDJSON stream to the end and records the request latency. The client-side
+summary is printed next to the server's own /metrics.
+"""
+
+import argparse
+import json
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from bench_allocation import synthetic_preferences
+
+
+def make_jobs(n_jobs, n_students, n_faculties, engine, seed=0):
+    return [
+        {
+            "id": f"job-{seed + k}",
+            "csv": synthetic_preferences(n_students, n_faculties, seed=seed + k).to_csv(index=False),
+            "engine": engine,
+        }
+        for k in range(n_jobs)
+    ]
+
+
+def post_batch(url, body):
+    # Returns (seconds, statuses of the streamed jobs)
+    request = urllib.request.Request(
+        f"{url}/allocate", data=body, headers={"Content-Type": "application/json"}, method="POST",
+    )
+    start = time.perf_counter()
+    statuses = []
+    with urllib.request.urlopen(request) as response:
+        for line in response:
+            if line.strip():
+                statuses.append(json.loads(line)["status"])
+    return time.perf_counter() - start, statuses
+
+
+def percentile(ordered, q):
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)] if ordered else float("nan")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the allocation service.")
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--jobs-per-request", type=int, default=4)
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--faculties", type=int, default=18)
+    parser.add_argument("--engine", default="cyclic", choices=["cyclic", "capacitated"])
+    args = parser.parse_args()
+
+    # The same payload is reused so the client measures the service, not itself
+    body = json.dumps({
+        "jobs": make_jobs(args.jobs_per_request, args.students, args.faculties, args.engine),
+    }).encode("utf-8")
+
+    latencies, errors, statuses = [], [], {}
+    lock = threading.Lock()
+
+    def one_request(_):
+        try:
+            seconds, job_statuses = post_batch(args.url, body)
+        except Exception as e:
+            with lock:
+                errors.append(f"{type(e).__name__}: {e}")
+            return
+        with lock:
+            latencies.append(seconds)
+            for status in job_statuses:
+                statuses[status] = statuses.get(status, 0) + 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(one_request, range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    ordered = sorted(latencies)
+    jobs = sum(statuses.values())
+    print(f"requests   {len(latencies)} ok, {len(errors)} failed in {elapsed:.2f}s")
+    print(f"jobs       {jobs} ({statuses}), {jobs / elapsed:.1f} jobs/s, {len(latencies) / elapsed:.1f} requests/s")
+    print(
+        f"latency s  p50 {percentile(ordered, 0.5):.3f}  p95 {percentile(ordered, 0.95):.3f}"
+        f"  p99 {percentile(ordered, 0.99):.3f}  max {percentile(ordered, 1.0):.3f}"
+    )
+    for message in errors[:5]:
+        print(f"error      {message}")
+    with urllib.request.urlopen(f"{args.url}/metrics") as response:
+        print("server     " + json.dumps(json.load(response), indent=2).replace("\n", "\n           "))
+
+
+if __name__ == "__main__":
+    main()
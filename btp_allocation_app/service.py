@@ -0,0 +1,237 @@
+"""
+Headless HTTP/JSON front end for the allocation engine, separate from the
+Streamlit page. Uses only the standard library next to pandas/numpy.
+
+    python service.py --port 8765 --workers 4
+
+POST /allocate takes several jobs at once:
+
+    {"jobs": [{"id": "cse", "csv": "Roll,Name,Email,CGPA,F1,...\\n...",
+               "engine": "capacitated", "options": {"max_cap": 6}}, ...]}
+
+and streams back one NDJSON line per job as soon as that job finishes
+(not in submission order):
+
+    {"id": "cse", "status": "ok", "seconds": 0.012, "allocation": [...],
+     "preference_counts": [...], "satisfaction": [...]}
+
+Jobs that fail validation come back with "status": "invalid" and the first
+issues of the report; set "force": true to allocate anyway. GET /metrics
+reports request/job counts, throughput and latency percentiles, GET /health
+answers once the worker pool is warm.
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from allocation import ENGINES, run_allocation
+from ingestion import read_allocation_csv
+from validation import validate_preferences
+
+# Largest request body accepted, in bytes
+MAX_BODY_BYTES = 256 * 2**20
+
+# Validation issues returned for an invalid job
+MAX_REPORTED_ISSUES = 50
+
+# Latency samples kept for the percentiles in /metrics
+LATENCY_WINDOW = 10_000
+
+
+def run_job(job):
+    # Runs in a worker process and returns (status, seconds, NDJSON line);
+    # the frames are serialized here rather than in the HTTP thread.
+    start = time.perf_counter()
+    job_id = json.dumps(job.get("id"))
+    try:
+        engine = job.get("engine", "cyclic")
+        if engine not in ENGINES:
+            raise ValueError(f"unknown engine {engine!r}, expected one of {sorted(ENGINES)}")
+        input_df = read_allocation_csv(job["csv"].encode("utf-8"))
+        report = validate_preferences(input_df)
+        if not report.empty and not job.get("force", False):
+            issues = report.head(MAX_REPORTED_ISSUES).to_json(orient="records")
+            seconds = time.perf_counter() - start
+            return "invalid", seconds, (
+                f'{{"id": {job_id}, "status": "invalid", "seconds": {seconds:.6f}, '
+                f'"issue_count": {len(report)}, "issues": {issues}}}'
+            )
+        output_df, pref_counts, satisfaction = run_allocation(input_df, engine, **job.get("options", {}))
+        seconds = time.perf_counter() - start
+        return "ok", seconds, (
+            f'{{"id": {job_id}, "status": "ok", "seconds": {seconds:.6f}, '
+            f'"allocation": {output_df.to_json(orient="records")}, '
+            f'"preference_counts": {pref_counts.to_json(orient="records")}, '
+            f'"satisfaction": {satisfaction.to_json(orient="records")}}}'
+        )
+    except Exception as e:
+        seconds = time.perf_counter() - start
+        return "error", seconds, json.dumps({
+            "id": job.get("id"), "status": "error", "seconds": round(seconds, 6),
+            "error": f"{type(e).__name__}: {e}",
+        })
+
+
+def _warm_up(_):
+    # Returns once a worker process has started and imported pandas
+    return True
+
+
+def _percentiles(samples):
+    if not samples:
+        return {"p50": None, "p95": None, "p99": None, "max": None}
+    ordered = sorted(samples)
+    pick = lambda q: round(ordered[min(int(q * len(ordered)), len(ordered) - 1)], 6)
+    return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99), "max": round(ordered[-1], 6)}
+
+
+class Metrics:
+    # Counters shared by all handler threads
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.requests = 0
+        self.jobs = 0
+        self.failed_jobs = 0
+        self.in_flight = 0
+        self.request_latency = deque(maxlen=LATENCY_WINDOW)
+        self.job_latency = deque(maxlen=LATENCY_WINDOW)
+
+    def begin(self):
+        with self.lock:
+            self.in_flight += 1
+
+    def finish_job(self, seconds, ok):
+        with self.lock:
+            self.jobs += 1
+            self.failed_jobs += not ok
+            self.job_latency.append(seconds)
+
+    def finish_request(self, seconds):
+        with self.lock:
+            self.requests += 1
+            self.in_flight -= 1
+            self.request_latency.append(seconds)
+
+    def snapshot(self):
+        with self.lock:
+            uptime = time.time() - self.started
+            return {
+                "uptime_seconds": round(uptime, 3),
+                "requests": self.requests,
+                "jobs": self.jobs,
+                "failed_jobs": self.failed_jobs,
+                "in_flight_requests": self.in_flight,
+                "jobs_per_second": round(self.jobs / max(uptime, 1e-9), 3),
+                "request_latency_seconds": _percentiles(self.request_latency),
+                "job_latency_seconds": _percentiles(self.job_latency),
+            }
+
+
+class AllocationHandler(BaseHTTPRequestHandler):
+    server_version = "BTPAllocation/1.0"
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok", "workers": self.server.workers})
+        elif self.path == "/metrics":
+            self._send_json(200, self.server.metrics.snapshot())
+        else:
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path != "/allocate":
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0 or length > MAX_BODY_BYTES:
+            self._send_json(413 if length else 411, {"error": f"body must be 1..{MAX_BODY_BYTES} bytes"})
+            return
+        try:
+            payload = json.loads(self.rfile.read(length))
+            jobs = payload.get("jobs") if isinstance(payload, dict) else None
+            if not isinstance(jobs, list) or not all(isinstance(j, dict) and "csv" in j for j in jobs):
+                raise ValueError("'jobs' must be a list of objects with a 'csv' field")
+        except ValueError as e:
+            self._send_json(400, {"error": f"bad request: {e}"})
+            return
+
+        metrics = self.server.metrics
+        metrics.begin()
+        start = time.perf_counter()
+        try:
+            # No Content-Length: the stream ends when the connection closes
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.end_headers()
+            futures = [self.server.pool.submit(run_job, job) for job in jobs]
+            try:
+                for future in as_completed(futures):
+                    status, seconds, line = future.result()
+                    metrics.finish_job(seconds, status == "ok")
+                    self.wfile.write(line.encode("utf-8") + b"\n")
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                # Client went away; drop the jobs that haven't started
+                for future in futures:
+                    future.cancel()
+        finally:
+            metrics.finish_request(time.perf_counter() - start)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+class AllocationServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, workers=None, quiet=False):
+        super().__init__(address, AllocationHandler)
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        self.metrics = Metrics()
+        self.quiet = quiet
+        # Start every worker now so the first request doesn't pay for it
+        list(self.pool.map(_warm_up, range(self.workers)))
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(cancel_futures=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve allocations over HTTP/JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--quiet", action="store_true", help="don't log every request")
+    args = parser.parse_args()
+
+    server = AllocationServer((args.host, args.port), args.workers, args.quiet)
+    print(f"Serving allocations on http://{args.host}:{args.port} with {server.workers} worker(s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
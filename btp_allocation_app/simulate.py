@@ -0,0 +1,170 @@
+"""
+What-if comparison of allocation policies on one preference matrix.
+
+    python simulate.py input_btp_mtp_allocation.csv --max-caps 5 6 8 --tie-breaks 4
+
+The parsed matrix and CGPA column are sorted into CGPA order once and
+placed in shared memory; worker processes attach to them instead of
+receiving a copy per policy. Each policy is a dict
+
+    {"name": "cap 6", "engine": "capacitated", "options": {"max_cap": 6}, "tie_seed": None}
+
+where tie_seed, when set, shuffles students with equal CGPA before the
+engine runs. The shuffle is a row-index order handed to the engine, so the
+shared matrix is never copied. The result is one row of satisfaction and
+fairness metrics per policy.
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from allocation import BLOCK_ROWS, ENGINES, faculty_columns, preference_matrix, student_order
+from ingestion import read_allocation_csv
+
+# Set in each worker by _attach
+_shared = {}
+
+
+def default_policies(n_students, n_faculties, max_caps=(), tie_breaks=0):
+    # The legacy cyclic rule, CGPA priority with everyone free to take their
+    # first choice, the even-share capacity, any extra caps, and the even
+    # share again under random tie-breaks.
+    even = -(-n_students // max(n_faculties, 1))
+    policies = [
+        {"name": "cyclic", "engine": "cyclic", "options": {}, "tie_seed": None},
+        {"name": "first choice", "engine": "capacitated", "options": {"max_cap": n_students}, "tie_seed": None},
+        {"name": f"cap {even} (even)", "engine": "capacitated", "options": {"max_cap": even}, "tie_seed": None},
+    ]
+    for cap in max_caps:
+        policies.append({"name": f"cap {cap}", "engine": "capacitated", "options": {"max_cap": cap}, "tie_seed": None})
+    for seed in range(tie_breaks):
+        policies.append({
+            "name": f"cap {even} tie-break {seed}", "engine": "capacitated",
+            "options": {"max_cap": even}, "tie_seed": seed,
+        })
+    return policies
+
+
+def _share(array, order):
+    # Copy the rows of array, taken in order, straight into a new block
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.take(array, order, axis=0, out=np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf))
+    return block, (block.name, array.shape, array.dtype.str)
+
+
+def _attach(specs):
+    # Worker initializer: map the parent's blocks as read-only arrays
+    for key, (name, shape, dtype) in specs.items():
+        block = shared_memory.SharedMemory(name=name)
+        array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        array.flags.writeable = False
+        _shared[key] = (block, array)
+
+
+def justified_envy(prefs, cgpa, allocated):
+    # A student has justified envy when some faculty they rank above their
+    # own took a student with a lower CGPA. Zero for a stable allocation.
+    n, n_faculties = prefs.shape
+    cutoff = np.full(n_faculties, np.inf)
+    np.minimum.at(cutoff, allocated, np.nan_to_num(cgpa, nan=-np.inf))
+    envious = np.zeros(n, dtype=bool)
+    for start in range(0, n, BLOCK_ROWS):
+        stop = min(start + BLOCK_ROWS, n)
+        block = prefs[start:stop].astype(np.float64)
+        own = block[np.arange(stop - start), allocated[start:stop]]
+        preferred = block < own[:, None]
+        envious[start:stop] = (preferred & (cutoff < cgpa[start:stop, None])).any(axis=1)
+    return envious
+
+
+def policy_metrics(prefs, cgpa, allocated):
+    n, n_faculties = prefs.shape
+    ranks = prefs[np.arange(n), allocated].astype(np.float64)
+    ranks[(ranks < 1) | (ranks > n_faculties)] = np.nan
+    load = np.bincount(allocated, minlength=n_faculties)
+    return {
+        "Mean Rank": np.nanmean(ranks),
+        "Median Rank": np.nanmedian(ranks),
+        "P90 Rank": np.nanpercentile(ranks, 90),
+        "Worst Rank": np.nanmax(ranks),
+        "Rank Std": np.nanstd(ranks),
+        "First Choice %": 100 * np.mean(ranks == 1),
+        "Top 3 %": 100 * np.mean(ranks <= 3),
+        "Justified Envy %": 100 * justified_envy(prefs, cgpa, allocated).mean(),
+        "Min Load": load.min(),
+        "Max Load": load.max(),
+    }
+
+
+def run_policy(policy):
+    # The shared rows are already in CGPA order. A tie-break only permutes
+    # rows within blocks of equal CGPA; the engine visits rows in that order
+    # and its seats are scattered back onto the shared rows for the metrics.
+    _, prefs = _shared["prefs"]
+    _, cgpa = _shared["cgpa"]
+    options = policy.get("options", {})
+    if policy.get("tie_seed") is None:
+        allocated = ENGINES[policy["engine"]](prefs, **options)
+    else:
+        rows = student_order(cgpa, policy["tie_seed"])
+        allocated = np.empty(len(rows), dtype=np.intp)
+        allocated[rows] = ENGINES[policy["engine"]](prefs, rows=rows, **options)
+    return policy_metrics(prefs, cgpa, allocated)
+
+
+def simulate(input_df, policies, workers=None):
+    # Run every policy over the same matrix in parallel and return one row
+    # per policy. A policy that fails (e.g. infeasible caps) keeps its row
+    # with the error message and empty metrics.
+    faculty_cols = faculty_columns(input_df)
+    prefs = np.ascontiguousarray(preference_matrix(input_df, faculty_cols))
+    cgpa = pd.to_numeric(input_df["CGPA"], errors="coerce").to_numpy(dtype=np.float64)
+    order = np.asarray(student_order(cgpa))
+    blocks, specs = [], {}
+    try:
+        for key, array in (("prefs", prefs), ("cgpa", cgpa)):
+            block, specs[key] = _share(array, order)
+            blocks.append(block)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=(specs,)) as pool:
+            futures = [pool.submit(run_policy, policy) for policy in policies]
+            rows = []
+            for policy, future in zip(policies, futures):
+                row = {"Policy": policy["name"], "Error": ""}
+                try:
+                    row.update(future.result())
+                except ValueError as e:
+                    row["Error"] = str(e)
+                rows.append(row)
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+    table = pd.DataFrame(rows)
+    return table[[c for c in table.columns if c != "Error"] + ["Error"]].round(3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare allocation policies on one upload.")
+    parser.add_argument("csv", help="allocation input CSV")
+    parser.add_argument("--max-caps", type=int, nargs="*", default=[], help="extra per-faculty caps to try")
+    parser.add_argument("--tie-breaks", type=int, default=0, help="random tie-break runs of the even cap")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--save", help="write the comparison table to this CSV")
+    args = parser.parse_args()
+
+    with open(args.csv, "rb") as fh:
+        input_df = read_allocation_csv(fh.read())
+    policies = default_policies(len(input_df), len(faculty_columns(input_df)), args.max_caps, args.tie_breaks)
+    table = simulate(input_df, policies, args.workers)
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(table.to_string(index=False))
+    if args.save:
+        table.to_csv(args.save, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import csv
+import io
+import json
+import threading
+import unittest
+import urllib.request
+from pathlib import Path
+
+from service import AllocationServer, run_job
+
+SAMPLE_CSV = Path(__file__).resolve().parent / "input_btp_mtp_allocation.csv"
+
+
+def expected_cgpa(text):
+    # CGPA per roll exactly as written in the CSV
+    return {row["Roll"]: float(row["CGPA"]) for row in csv.DictReader(io.StringIO(text))}
+
+
+class CgpaRoundTripTest(unittest.TestCase):
+    # CGPA is held as float32 internally; clients must still get the
+    # decimal value from the upload (9.71, not 9.7100000381)
+
+    @classmethod
+    def setUpClass(cls):
+        cls.text = SAMPLE_CSV.read_text()
+        cls.expected = expected_cgpa(cls.text)
+
+    def assertExactCgpa(self, allocation):
+        self.assertEqual(len(allocation), len(self.expected))
+        for row in allocation:
+            self.assertEqual(row["CGPA"], self.expected[row["Roll"]], row["Roll"])
+
+    def test_run_job(self):
+        status, _, line = run_job({"id": "sample", "csv": self.text})
+        self.assertEqual(status, "ok")
+        self.assertExactCgpa(json.loads(line)["allocation"])
+
+    def test_allocate_endpoint(self):
+        server = AllocationServer(("127.0.0.1", 0), workers=1, quiet=True)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            body = json.dumps({"jobs": [
+                {"id": "cyclic", "csv": self.text},
+                {"id": "capacitated", "csv": self.text, "engine": "capacitated"},
+            ]}).encode("utf-8")
+            request = urllib.request.Request(
+                f"http://127.0.0.1:{server.server_address[1]}/allocate", data=body,
+                headers={"Content-Type": "application/json"},
+            )
+            with urllib.request.urlopen(request, timeout=60) as response:
+                results = [json.loads(line) for line in response.read().splitlines()]
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertEqual(sorted(r["id"] for r in results), ["capacitated", "cyclic"])
+        for result in results:
+            self.assertEqual(result["status"], "ok")
+            self.assertExactCgpa(result["allocation"])
+
+
+if __name__ == "__main__":
+    unittest.main()
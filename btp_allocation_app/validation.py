@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+
+from allocation import BLOCK_ROWS, faculty_columns
+
+REQUIRED_COLUMNS = ["Roll", "Name", "Email", "CGPA"]
+REPORT_COLUMNS = ["Row", "Roll", "Issue", "Detail"]
+
+
+def _issue(rows, rolls, issue, detail):
+    return pd.DataFrame({
+        "Row": rows, "Roll": rolls.iloc[rows].astype(str).to_numpy(), "Issue": issue, "Detail": detail,
+    })
+
+
+def _repeated_ranks(ranks, n_faculties):
+    # ranks holds valid ranks 1..F and 0 for anything invalid (ignored).
+    # Up to 63 faculties each row keeps a 64-bit "seen" mask; beyond that
+    # rows are radix-sorted as small unsigned ints and adjacent values compared.
+    n = len(ranks)
+    repeated = np.zeros(n, dtype=bool)
+    if n_faculties < 64:
+        seen = np.zeros(n, dtype=np.uint64)
+        for column in ranks.T:
+            bit = np.left_shift(np.uint64(1), column.astype(np.uint64))
+            repeated |= (seen & bit) > 1
+            seen |= bit
+        return repeated
+    small = np.uint8 if n_faculties < 256 else np.uint16
+    for start in range(0, n, BLOCK_ROWS):
+        block = np.sort(ranks[start:start + BLOCK_ROWS].astype(small), axis=1, kind="stable")
+        same = (np.diff(block, axis=1) == 0) & (block[:, 1:] > 0)
+        repeated[start:start + len(block)] = same.any(axis=1)
+    return repeated
+
+
+def validate_preferences(input_df):
+    # Check the whole upload at once and return one report line per
+    # (row, problem). Row is the 1-based data row (the CSV line minus the
+    # header); an empty report means the matrix is safe to allocate.
+    missing_cols = [c for c in REQUIRED_COLUMNS if c not in input_df.columns]
+    if missing_cols:
+        return pd.DataFrame([{
+            "Row": None, "Roll": None, "Issue": "missing columns", "Detail": ", ".join(missing_cols),
+        }], columns=REPORT_COLUMNS)
+    faculty_cols = faculty_columns(input_df)
+    if not faculty_cols:
+        return pd.DataFrame([{
+            "Row": None, "Roll": None, "Issue": "no faculty columns", "Detail": "expected columns after CGPA",
+        }], columns=REPORT_COLUMNS)
+
+    rolls = input_df["Roll"]
+    n_faculties = len(faculty_cols)
+    reports = []
+
+    # Roll numbers must be unique
+    dup_roll = np.flatnonzero(input_df["Roll"].duplicated(keep=False).to_numpy())
+    reports.append(_issue(dup_roll, rolls, "duplicate roll", "roll appears more than once"))
+
+    # CGPA must be present and numeric
+    raw_cgpa = input_df["CGPA"]
+    cgpa = pd.to_numeric(raw_cgpa, errors="coerce")
+    no_cgpa = np.flatnonzero(raw_cgpa.isna().to_numpy())
+    bad_cgpa = np.flatnonzero((cgpa.isna() & raw_cgpa.notna()).to_numpy())
+    reports.append(_issue(no_cgpa, rolls, "missing CGPA", ""))
+    reports.append(_issue(bad_cgpa, rolls, "non-numeric CGPA", raw_cgpa.iloc[bad_cgpa].astype(str).to_numpy()))
+
+    # Preferences: present, numeric, integral, within 1..F and no rank twice
+    raw = input_df[faculty_cols]
+    if all(pd.api.types.is_integer_dtype(t) for t in raw.dtypes):
+        prefs = raw.to_numpy()
+        missing = non_numeric = np.zeros(len(raw), dtype=np.int64)
+        valid = (prefs >= 1) & (prefs <= n_faculties)
+        out_of_range = (~valid).sum(axis=1)
+    else:
+        coerced = raw
+        if not all(pd.api.types.is_numeric_dtype(t) for t in raw.dtypes):
+            coerced = raw.apply(pd.to_numeric, errors="coerce")
+        numeric = coerced.to_numpy(dtype=float)
+        absent = raw.isna().to_numpy()
+        empty = np.isnan(numeric)
+        missing = absent.sum(axis=1)
+        non_numeric = (empty & ~absent).sum(axis=1)
+        with np.errstate(invalid="ignore"):
+            valid = (numeric >= 1) & (numeric <= n_faculties) & (numeric == np.floor(numeric))
+        out_of_range = (~empty & ~valid).sum(axis=1)
+        prefs = np.where(valid, numeric, 0).astype(np.intp)
+    repeated = _repeated_ranks(np.where(valid, prefs, 0), n_faculties)
+
+    for counts, issue in (
+        (missing, "missing preference"),
+        (non_numeric, "non-numeric preference"),
+        (out_of_range, f"preference outside 1..{n_faculties}"),
+    ):
+        rows = np.flatnonzero(counts)
+        reports.append(_issue(rows, rolls, issue, counts[rows].astype(str).astype(object) + " value(s)"))
+
+    rows = np.flatnonzero(repeated)
+    reports.append(_issue(rows, rolls, "duplicate rank", "same rank given to several faculties"))
+
+    report = pd.concat(reports, ignore_index=True)
+    report["Row"] = report["Row"] + 1
+    return report.sort_values("Row", kind="stable").reset_index(drop=True)[REPORT_COLUMNS]
@@ -0,0 +1,184 @@
+"""
+Benchmark harness for the grouping modes in grouping.py.
+
+Generates synthetic rosters, times every mode over a grid of cohort sizes
+and group counts, records peak traced memory, and saves the results as JSON
+so two runs can be compared:
+
+    python bench_grouping.py --sizes 1000 10000 50000 --groups 10 100 --save base.json
+    python bench_grouping.py --sizes 1000 10000 50000 --groups 10 100 --compare base.json
+
+A measurement slower (or hungrier) than the baseline by more than
+``--threshold`` is flagged as a regression and the exit code is 1.
+Differences smaller than ``--min-seconds`` / ``--min-mb`` are treated as
+noise, so tiny cohorts whose timings jitter by tens of milliseconds do not
+fail the comparison.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+import grouping
+
+DEFAULT_BRANCHES = ("AI", "CB", "CE", "CH", "CS", "CT", "EC", "MC", "MM", "MT")
+MODES = ("branch", "round-robin", "balanced", "stratified")
+# Smallest absolute change per metric that can count as a regression
+MIN_DELTA = {"seconds": 0.05, "peak_mb": 1.0}
+
+
+def synthetic_roster(
+    n: int,
+    branches=DEFAULT_BRANCHES,
+    skew: float = 1.0,
+    year: str = "2101",
+    roll_format: str = "{year}{branch}{serial:04d}",
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    Build a random roster shaped like ``input_Make Groups.xlsx``.
+
+    Args:
+        n (int): Number of students.
+        branches (sequence): Two-letter branch codes.
+        skew (float): Zipf exponent for branch sizes; 0 gives equal branches.
+        year (str): Prefix placed before the branch code in each roll.
+        roll_format (str): Format of a roll; must put the branch at [4:6].
+        seed (int): Random seed.
+
+    Returns:
+        pd.DataFrame: Roll, Name, Email plus Gender, CGPA and Hostel columns
+            for the stratified mode.
+    """
+    rng = np.random.default_rng(seed)
+    weights = 1.0 / np.arange(1, len(branches) + 1) ** skew
+    branch = rng.choice(np.asarray(branches), size=n, p=weights / weights.sum())
+    serial = np.zeros(n, dtype=np.int64)
+    for code in branches:
+        mask = branch == code
+        serial[mask] = np.arange(1, mask.sum() + 1)
+    rolls = [roll_format.format(year=year, branch=b, serial=s) for b, s in zip(branch, serial)]
+    names = [f"Student{i}" for i in range(n)]
+    return pd.DataFrame({
+        "Roll": rolls,
+        "Name": names,
+        "Email": [f"{name}@mycollege.in" for name in names],
+        "Gender": rng.choice(["M", "F"], size=n, p=[0.6, 0.4]),
+        "CGPA": rng.normal(7.5, 1.0, size=n).clip(4, 10).round(2),
+        "Hostel": rng.choice([f"H{i}" for i in range(1, 9)], size=n),
+    })
+
+
+def run_mode(mode: str, roster: pd.DataFrame, groups: int, output_dir: str):
+    if mode == "branch":
+        return grouping.export_branchwise(roster, output_dir)
+    if mode == "round-robin":
+        return grouping.distribute_round_robin(roster, groups, output_dir)
+    if mode == "balanced":
+        return grouping.balanced_split(roster, groups, output_dir)
+    return grouping.stratified_split(roster, groups, ("Gender", "CGPA", "Hostel"), output_dir)
+
+
+def measure(mode: str, roster: pd.DataFrame, groups: int, repeat: int) -> dict:
+    """Best wall time over ``repeat`` runs and peak traced memory of one run."""
+    times = []
+    with tempfile.TemporaryDirectory() as output_dir:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run_mode(mode, roster, groups, output_dir)
+            times.append(time.perf_counter() - start)
+        tracemalloc.start()
+        run_mode(mode, roster, groups, output_dir)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {"seconds": min(times), "peak_mb": peak / 2**20}
+
+
+def compare(results: list, baseline: list, threshold: float, min_delta: dict = MIN_DELTA) -> list:
+    """Return a message for every measurement worse than baseline by > threshold.
+
+    A metric must also grow by at least ``min_delta[metric]`` to count.
+    """
+    base = {(r["mode"], r["students"], r["groups"]): r for r in baseline}
+    regressions = []
+    for r in results:
+        old = base.get((r["mode"], r["students"], r["groups"]))
+        if old is None:
+            continue
+        for metric in ("seconds", "peak_mb"):
+            delta = r[metric] - old[metric]
+            if delta > old[metric] * threshold and delta >= min_delta[metric]:
+                regressions.append(
+                    f"{r['mode']} n={r['students']} g={r['groups']}: "
+                    f"{metric} {old[metric]:.3f} -> {r[metric]:.3f}"
+                )
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the grouping modes.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--groups", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--skew", type=float, default=1.0, help="Zipf exponent of branch sizes")
+    parser.add_argument("--roll-format", default="{year}{branch}{serial:04d}")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown, 0.2 = 20%%")
+    parser.add_argument("--min-seconds", type=float, default=MIN_DELTA["seconds"], help="ignore smaller slowdowns")
+    parser.add_argument("--min-mb", type=float, default=MIN_DELTA["peak_mb"], help="ignore smaller memory growth")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    results = []
+    print(f"{'mode':<12}{'students':>10}{'groups':>8}{'seconds':>10}{'peak MB':>10}")
+    for n in args.sizes:
+        roster = grouping.prepare_roster(
+            synthetic_roster(n, skew=args.skew, roll_format=args.roll_format, seed=args.seed)
+        )
+        for mode in args.modes:
+            # Branch export does not depend on the number of groups
+            for groups in ([0] if mode == "branch" else args.groups):
+                row = {"mode": mode, "students": n, "groups": groups}
+                row.update(measure(mode, roster, groups, args.repeat))
+                results.append(row)
+                print(f"{mode:<12}{n:>10}{groups:>8}{row['seconds']:>10.3f}{row['peak_mb']:>10.1f}")
+
+    if args.save:
+        payload = {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "results": results,
+        }
+        with open(args.save, "w") as fh:
+            json.dump(payload, fh, indent=2)
+
+    if args.compare:
+        with open(args.compare) as fh:
+            regressions = compare(
+                results, json.load(fh)["results"], args.threshold,
+                {"seconds": args.min_seconds, "peak_mb": args.min_mb},
+            )
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+Batch command-line front end for the grouping library.
+
+Runs every (roster, group count) combination in parallel across CPU cores
+without importing Streamlit, for example:
+
+    python group_cli.py rosters/*.xlsx --mode balanced --groups 4 8 12 -o runs
+
+Each job writes into ``<output>/<roster name>/<mode>[_<groups>]/``.
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+MODES = ("branch", "branch-stream", "round-robin", "balanced", "stratified")
+
+
+def run_job(roster: str, mode: str, groups, output_dir: str, attributes=()):
+    """
+    Run one grouping job in a worker process.
+
+    Args:
+        roster (str): Path of the CSV/Excel roster.
+        mode (str): One of ``MODES``.
+        groups (int | None): Number of groups (ignored by the branch modes).
+        output_dir (str): Folder the job writes its files into.
+        attributes (sequence): Extra columns for the stratified mode.
+
+    Returns:
+        tuple: (number of files written, seconds taken)
+    """
+    # Imported here so `--help` and argument errors stay instant
+    import grouping
+
+    start = time.perf_counter()
+    if mode == "branch-stream":
+        files, _ = grouping.export_branchwise_chunked(roster, output_dir)
+    else:
+        df = grouping.read_roster(roster, roster)
+        if mode == "branch":
+            files, _ = grouping.export_branchwise(df, output_dir)
+        elif mode == "round-robin":
+            files, _ = grouping.distribute_round_robin(df, groups, output_dir)
+        elif mode == "balanced":
+            files, _ = grouping.balanced_split(df, groups, output_dir)
+        else:
+            files, _ = grouping.stratified_split(df, groups, attributes, output_dir)
+    return len(files), time.perf_counter() - start
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate student groups for many rosters in parallel.")
+    parser.add_argument("rosters", nargs="+", help="CSV/Excel roster files")
+    parser.add_argument("--mode", choices=MODES, default="balanced")
+    parser.add_argument("--groups", type=int, nargs="+", default=[4], help="one or more group counts")
+    parser.add_argument("--attributes", nargs="*", default=[], help="extra columns for --mode stratified")
+    parser.add_argument("-o", "--output", default="output", help="root output folder")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(), help="parallel worker processes")
+    args = parser.parse_args(argv)
+    if args.mode == "branch-stream" and any(not r.endswith("csv") for r in args.rosters):
+        parser.error("--mode branch-stream needs CSV rosters")
+    if any(g < 1 for g in args.groups):
+        parser.error("--groups must be positive")
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    counts = [None] if args.mode.startswith("branch") else args.groups
+
+    jobs = {}
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for roster in args.rosters:
+            for groups in counts:
+                run_name = args.mode if groups is None else f"{args.mode}_{groups}"
+                target = Path(args.output) / Path(roster).stem / run_name
+                future = pool.submit(run_job, roster, args.mode, groups, str(target), tuple(args.attributes))
+                jobs[future] = target
+
+        failed = 0
+        for future in as_completed(jobs):
+            target = jobs[future]
+            try:
+                n_files, seconds = future.result()
+            except Exception as exc:
+                failed += 1
+                print(f"FAILED {target}: {exc}", file=sys.stderr)
+            else:
+                print(f"{target}: {n_files} files in {seconds:.2f}s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,733 @@
+"""
+Student grouping library behind the tut_01 Streamlit app and CLI.
+
+Everything here is free of import-time side effects: nothing is created on
+disk until a function writes into the ``output_dir`` it is given, and
+Streamlit is never imported. Passing ``output_dir=None`` only serializes:
+the CSV bytes are returned and nothing is written, so a caller can cache
+the computation and write the bytes later with ``save_groups``.
+"""
+
+import pandas as pd
+import numpy as np
+import math
+import zipfile
+from io import BytesIO
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from importlib.util import find_spec
+from pathlib import Path
+
+
+# File Handling Utilities
+
+OUTPUT_DIR = Path("output")
+
+# Batch writes are handed to a small thread pool so many group files reach
+# the disk concurrently; serialization itself happens exactly once per
+# DataFrame. The pool is created on first use so importing this module has
+# no side effects.
+_io_pool = None
+
+
+def _writer_pool() -> ThreadPoolExecutor:
+    """Return the shared CSV writer pool, creating it on first use."""
+    global _io_pool
+    if _io_pool is None:
+        _io_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="csv-writer")
+    return _io_pool
+
+
+def _output_path(output_dir, filename: str) -> Path:
+    """Resolve ``filename`` inside ``output_dir``, creating the folder if needed."""
+    folder = Path(output_dir)
+    folder.mkdir(parents=True, exist_ok=True)
+    return folder / filename
+
+
+def _encode_csv(df: pd.DataFrame) -> bytes:
+    """Serialize a DataFrame to CSV bytes (the single serialization pass)."""
+    return df.to_csv(index=False).encode("utf-8")
+
+
+def save_csv(df: pd.DataFrame, filename: str, output_dir=OUTPUT_DIR) -> bytes:
+    """
+    Save a DataFrame both to disk and return a downloadable CSV in memory.
+
+    The frame is serialized once; the same bytes are written to disk and
+    returned for the download button.
+
+    Args:
+        df (pd.DataFrame | bytes): The DataFrame to save, or CSV bytes
+            that are written as they are.
+        filename (str): Desired output file name.
+        output_dir (str | Path | None): Folder the file is written to;
+            None skips the write.
+
+    Returns:
+        bytes: Encoded CSV content for Streamlit download button.
+    """
+    data = df if isinstance(df, bytes) else _encode_csv(df)
+    if output_dir is not None:
+        _output_path(output_dir, filename).write_bytes(data)
+    return data
+
+
+def save_csv_batch(frames: dict, output_dir=OUTPUT_DIR) -> dict:
+    """
+    Save many DataFrames at once, flushing all files to disk concurrently.
+
+    Args:
+        frames (dict): Mapping of filename → DataFrame or CSV bytes; bytes
+            are written without re-serializing.
+        output_dir (str | Path | None): Folder the files are written to;
+            None skips the writes.
+
+    Returns:
+        dict: Mapping of filename → CSV bytes, in the order given.
+    """
+    payloads = {
+        fname: frame if isinstance(frame, bytes) else _encode_csv(frame)
+        for fname, frame in frames.items()
+    }
+    if output_dir is None:
+        return payloads
+    writes = [
+        _writer_pool().submit(_output_path(output_dir, fname).write_bytes, data)
+        for fname, data in payloads.items()
+    ]
+    for write in writes:
+        write.result()
+    return payloads
+
+
+def save_groups(prefix: str, frames: dict, output_dir=OUTPUT_DIR) -> dict:
+    """
+    Save one run's group files and delete ``{prefix}_group_*.csv`` files
+    left in ``output_dir`` by an earlier run with more groups, so the folder
+    only ever holds a single run per prefix.
+
+    Args:
+        prefix (str): File prefix of the run, e.g. "balanced" or "mix".
+        frames (dict): Mapping of filename → DataFrame or CSV bytes.
+        output_dir (str | Path | None): Folder the files are written to;
+            None skips the writes.
+
+    Returns:
+        dict: Mapping of filename → CSV bytes, in the order given.
+    """
+    files = save_csv_batch(frames, output_dir)
+    if output_dir is None:
+        return files
+    for path in Path(output_dir).glob(f"{prefix}_group_*.csv"):
+        if path.name not in files:
+            path.unlink(missing_ok=True)
+    return files
+
+
+def build_archive(files: dict, stats=None) -> bytes:
+    """
+    Pack every generated file (and the stats table) into one in-memory zip.
+
+    Args:
+        files (dict): Mapping of filename → CSV bytes or path of a written file.
+        stats (tuple | None): (stats filename, stats CSV bytes, stats DataFrame).
+
+    Returns:
+        bytes: The zip archive.
+    """
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for fname, content in files.items():
+            if isinstance(content, Path):
+                archive.write(content, fname)
+            else:
+                archive.writestr(fname, content)
+        if stats:
+            archive.writestr(stats[0], stats[1])
+    return buffer.getvalue()
+
+
+
+# Roster Ingestion
+
+# Spreadsheet artefacts that never reach the group files
+DROP_COLUMNS = ("Unique",)
+
+
+def _keep_column(name) -> bool:
+    """Column filter for the readers: skip blank 'Unnamed: n' and helper columns."""
+    return not (str(name).startswith("Unnamed:") or name in DROP_COLUMNS)
+
+
+def _excel_engine():
+    """Prefer the Rust-based calamine reader when it is installed and pandas (2.2+) accepts it."""
+    pandas_version = tuple(int(part) for part in pd.__version__.split(".")[:2])
+    return "calamine" if pandas_version >= (2, 2) and find_spec("python_calamine") else None
+
+
+def prepare_roster(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Drop unused columns and derive the categorical ``dept`` code once.
+
+    Frames that already went through this step are returned untouched, so the
+    grouping functions can share a single parsed roster without copying it.
+
+    Args:
+        df (pd.DataFrame): Raw roster with a 'Roll' column.
+
+    Returns:
+        pd.DataFrame: Roster with a categorical 'dept' column.
+    """
+    if isinstance(df.get("dept"), pd.Series) and isinstance(df["dept"].dtype, pd.CategoricalDtype):
+        return df
+    data = df[[c for c in df.columns if _keep_column(c)]].copy()
+    data["dept"] = data["Roll"].astype(str).str[4:6].astype("category")
+    return data
+
+
+def read_roster(source, name: str) -> pd.DataFrame:
+    """
+    Load a CSV/Excel roster, materialising only the columns we need.
+
+    Roll, Name, Email and any other named columns are kept; blank
+    'Unnamed: n' columns and helper columns are pruned at parse time.
+
+    Args:
+        source: Path or file-like object.
+        name (str): Original file name, used to pick the parser.
+
+    Returns:
+        pd.DataFrame: Prepared roster (see ``prepare_roster``).
+    """
+    if str(name).endswith("csv"):
+        df = pd.read_csv(source, usecols=_keep_column, dtype={"Roll": str})
+    else:
+        df = pd.read_excel(source, usecols=_keep_column, dtype={"Roll": str}, engine=_excel_engine())
+    return prepare_roster(df)
+
+
+
+#  Grouping Functions
+
+def export_branchwise(df: pd.DataFrame, output_dir=OUTPUT_DIR):
+    """
+    Export students into separate CSV files grouped by branch.
+
+    Args:
+        df (pd.DataFrame): Input dataset containing a 'Roll' column.
+        output_dir (str | Path): Folder the CSV files are written to.
+
+    Returns:
+        dict: Mapping of filenames → CSV bytes for download.
+        None: Placeholder since no stats are generated here.
+    """
+    cleaned = prepare_roster(df).rename(columns={"dept": "branch"})
+
+    blocks = {f"branch_{branch}.csv": block for branch, block in cleaned.groupby("branch", observed=True)}
+    return save_csv_batch(blocks, output_dir), None
+
+
+def export_branchwise_chunked(
+    source,
+    output_dir=OUTPUT_DIR,
+    chunksize: int = 100_000,
+    max_open: int = 32,
+):
+    """
+    Stream a CSV roster into per-branch files without loading it whole.
+
+    Logic:
+        - The roster is read ``chunksize`` rows at a time.
+        - Branch is derived from ``Roll[4:6]`` per chunk.
+        - Each branch block is appended to its file through a pool of at
+          most ``max_open`` open writers (least recently used is closed).
+
+    Memory is bounded by the chunk size, not the roster size. Output files
+    match ``export_branchwise`` row for row.
+
+    Args:
+        source: Path or file-like object of a CSV roster.
+        output_dir (str | Path): Folder the CSV files are written to.
+        chunksize (int): Rows parsed per chunk.
+        max_open (int): Maximum number of simultaneously open output files.
+
+    Returns:
+        dict: Mapping of filenames → paths of the written files.
+        None: Placeholder since no stats are generated here.
+    """
+    writers = OrderedDict()
+    paths = {}
+    reader = pd.read_csv(source, usecols=_keep_column, dtype={"Roll": str}, chunksize=chunksize)
+    try:
+        for chunk in reader:
+            chunk["branch"] = chunk["Roll"].astype(str).str[4:6]
+            for branch, block in chunk.groupby("branch", sort=False):
+                fname = f"branch_{branch}.csv"
+                started = fname in paths
+                handle = writers.pop(branch, None)
+                if handle is None:
+                    if len(writers) >= max_open:
+                        writers.popitem(last=False)[1].close()
+                    paths[fname] = _output_path(output_dir, fname)
+                    handle = open(paths[fname], "a" if started else "w", newline="", encoding="utf-8")
+                writers[branch] = handle
+                block.to_csv(handle, index=False, header=not started)
+    finally:
+        for handle in writers.values():
+            handle.close()
+
+    return dict(sorted(paths.items())), None
+
+
+def distribute_round_robin(df: pd.DataFrame, groups: int, output_dir=OUTPUT_DIR):
+    """
+    Interleave students from each department into a fixed number of groups.
+
+    Logic:
+        - Each department list is traversed in order.
+        - Students are assigned in a round-robin fashion.
+        - Groups are filled until desired size is reached.
+
+    Args:
+        df (pd.DataFrame): Input dataset with Roll numbers.
+        groups (int): Number of groups to generate.
+        output_dir (str | Path): Folder the CSV files are written to.
+
+    Returns:
+        dict: Generated group CSVs.
+        tuple: (stats filename, stats CSV bytes, stats DataFrame)
+    """
+    base = prepare_roster(df)
+
+    # Split into pools by department
+    sequence = list(dict.fromkeys(base["dept"]))
+    pools = {d: base[base["dept"] == d].reset_index(drop=True) for d in sequence}
+    positions = {d: 0 for d in sequence}
+
+    group_size = math.ceil(len(base) / groups)
+    containers = [[] for _ in range(groups)]
+
+    for g in range(groups):
+        while len(containers[g]) < group_size:
+            inserted = False
+            for d in sequence:
+                if positions[d] < len(pools[d]):
+                    containers[g].append(pools[d].iloc[positions[d]].to_dict())
+                    positions[d] += 1
+                    inserted = True
+                    if len(containers[g]) >= group_size:
+                        break
+            if not inserted:
+                break
+
+    # Build DataFrames for each group
+    final = [pd.DataFrame(chunk) for chunk in containers if chunk]
+
+    files = save_groups("mix", {f"mix_group_{i}.csv": gdf for i, gdf in enumerate(final, 1)}, output_dir)
+
+    # Create department count stats
+    summary = []
+    for i, gdf in enumerate(final, 1):
+        counts = gdf["dept"].value_counts().to_dict()
+        counts["Group"] = f"G{i}"
+        summary.append(counts)
+
+    stats = pd.DataFrame(summary).fillna(0).set_index("Group")
+    stats["Total"] = stats.sum(axis=1)
+
+    stats_name = "round_robin_stats.csv"
+    stats_bytes = save_csv(stats.reset_index(), stats_name, output_dir)
+    return files, (stats_name, stats_bytes, stats)
+
+
+def balanced_split(df: pd.DataFrame, groups: int, output_dir=OUTPUT_DIR):
+    """
+    Distribute students across groups such that sizes are as balanced as possible.
+
+    Method:
+        - Sort departments by size.
+        - Lay the departments out back to back and cut the sequence into
+          consecutive blocks of ``group_sizes``.
+        - Ensure remainder distribution keeps groups balanced.
+
+    Group membership is computed as a single integer array, the groups are
+    positional slices of one reordered frame and the stats table is a single
+    crosstab, so no per-row records are materialised.
+
+    Args:
+        df (pd.DataFrame): Dataset with Roll numbers.
+        groups (int): Number of groups.
+        output_dir (str | Path): Folder the CSV files are written to.
+
+    Returns:
+        dict: Generated CSVs for each group.
+        tuple: (stats filename, stats CSV bytes, stats DataFrame)
+    """
+    data = prepare_roster(df)
+    codes = data["dept"].cat.codes.to_numpy()
+    present, first_seen = np.unique(codes, return_index=True)
+    sizes = np.bincount(codes)[present]
+    dept_list = data["dept"].cat.categories[present[np.argsort(first_seen)]].tolist()
+
+    # Order departments largest first (ties by first appearance) and lay
+    # their rows out back to back
+    rank = np.empty(codes.max() + 1 if len(codes) else 0, dtype=np.intp)
+    rank[present[np.lexsort((first_seen, -sizes))]] = np.arange(len(present))
+    data = data.iloc[np.argsort(rank[codes], kind="stable")].reset_index(drop=True)
+
+    # Pre-compute group sizes and the group id of every row
+    q, r = divmod(len(data), groups)
+    group_sizes = np.full(groups, q)
+    group_sizes[:r] += 1
+    bounds = np.concatenate(([0], np.cumsum(group_sizes)))
+    group_ids = np.repeat(np.arange(groups), group_sizes)
+
+    files = save_groups("balanced", {
+        f"balanced_group_{i + 1}.csv": data.iloc[bounds[i]: bounds[i + 1]]
+        for i in range(groups)
+    }, output_dir)
+
+    # Build stats summary
+    labels = [f"G{i}" for i in range(1, groups + 1)]
+    stats_table = pd.crosstab(
+        pd.Categorical.from_codes(group_ids, categories=labels),
+        data["dept"].to_numpy(),
+        dropna=False,
+    )
+    stats_table = stats_table.reindex(index=labels, columns=dept_list, fill_value=0)
+    stats_table.index.name = None
+    stats_table.columns.name = None
+
+    stats_table["Total"] = stats_table.sum(axis=1)
+
+    stats_name = "balanced_stats.csv"
+    stats_bytes = save_csv(stats_table.reset_index(), stats_name, output_dir)
+    return files, (stats_name, stats_bytes, stats_table)
+
+
+def _encode_attribute(values: pd.Series, bands: int) -> np.ndarray:
+    """Integer-code one attribute; numeric columns are cut into quantile bands."""
+    if pd.api.types.is_numeric_dtype(values) and values.nunique() > bands:
+        codes = pd.qcut(values, bands, labels=False, duplicates="drop").fillna(-1)
+    elif isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes
+    else:
+        codes = pd.Series(pd.Categorical(values.astype(str)).codes)
+    codes = codes.to_numpy(dtype=np.int64, copy=True)
+    # Missing values form their own stratum
+    codes[codes < 0] = codes.max() + 1
+    return codes
+
+
+def _balance_columns(data: pd.DataFrame, member: np.ndarray, groups: int, names, bands: int) -> dict:
+    """
+    Per-group balance columns of the stratified stats table.
+
+    ``dev_<attribute>`` counts the students out of place relative to a
+    perfectly proportional group; numeric attributes also get
+    ``mean_<attribute>``. ``member`` holds 0-based group numbers.
+    """
+    sizes = np.bincount(member, minlength=groups)
+    group_col = pd.Categorical.from_codes(member, categories=[f"G{i}" for i in range(1, groups + 1)])
+    columns = {}
+    for name in names:
+        codes = _encode_attribute(data[name], bands)
+        counts = np.zeros((groups, codes.max() + 1 if len(codes) else 0))
+        np.add.at(counts, (member, codes), 1)
+        dev = counts - np.outer(sizes, counts.sum(axis=0)) / max(len(member), 1)
+        columns[f"dev_{name}"] = np.abs(dev).sum(axis=1) / 2
+        if pd.api.types.is_numeric_dtype(data[name]):
+            columns[f"mean_{name}"] = data[name].groupby(group_col, observed=False).mean().to_numpy()
+    return columns
+
+
+def _improving_swaps(codes, offsets, member, dev, batch, rng):
+    """
+    Sample ``batch`` random cross-group swaps and return the improving ones.
+
+    For a swap of student a (group g) with b (group h) only the cells of the
+    attributes on which a and b differ change, so the change of the squared
+    deviation objective is evaluated in O(attributes) per candidate.
+    """
+    n = len(member)
+    a = rng.integers(0, n, batch)
+    b = rng.integers(0, n, batch)
+    g, h = member[a], member[b]
+    delta = np.zeros(batch)
+    for k in range(codes.shape[1]):
+        x = offsets[k] + codes[a, k]
+        y = offsets[k] + codes[b, k]
+        differs = x != y
+        delta += differs * (4 - 2 * dev[g, x] + 2 * dev[g, y] + 2 * dev[h, x] - 2 * dev[h, y])
+    keep = (g != h) & (delta < -1e-9)
+    order = np.argsort(delta[keep], kind="stable")
+    return a[keep][order], b[keep][order]
+
+
+def stratified_split(
+    df: pd.DataFrame,
+    groups: int,
+    attributes=(),
+    output_dir=OUTPUT_DIR,
+    bands: int = 4,
+    max_rounds: int = 500,
+    patience: int = 10,
+    seed: int = 0,
+):
+    """
+    Form equal-size groups balanced on several attributes at once.
+
+    Method:
+        - Department plus every column in ``attributes`` is integer-coded;
+          numeric columns (e.g. CGPA) are cut into ``bands`` quantile bands.
+        - Greedy start: students are sorted by their combined strata and
+          dealt out to groups in turn, which balances sizes exactly.
+        - Local search: batches of random cross-group swaps are scored with an
+          incremental squared-deviation objective and the improving,
+          non-conflicting ones are applied until ``patience`` batches in a
+          row yield nothing.
+
+    Args:
+        df (pd.DataFrame): Dataset with Roll numbers and the attribute columns.
+        groups (int): Number of groups.
+        attributes (sequence): Extra columns to balance (gender, CGPA, hostel, ...).
+        output_dir (str | Path): Folder the CSV files are written to.
+        bands (int): Number of quantile bands for numeric attributes.
+        max_rounds (int): Upper bound on local-search batches.
+        patience (int): Stop after this many batches without an improving swap.
+        seed (int): Seed for the swap sampler, for reproducible groups.
+
+    Returns:
+        dict: Generated CSVs for each group.
+        tuple: (stats filename, stats CSV bytes, stats DataFrame); the stats
+            table carries per-group department counts, Total and one
+            ``dev_<attribute>`` column per attribute (students out of place
+            relative to a perfectly proportional group), plus
+            ``mean_<attribute>`` for numeric attributes.
+    """
+    data = prepare_roster(df)
+    names = ["dept"] + [a for a in attributes if a != "dept"]
+    codes = np.column_stack([_encode_attribute(data[a], bands) for a in names])
+    widths = codes.max(axis=0) + 1
+    offsets = np.concatenate(([0], np.cumsum(widths)[:-1]))
+
+    n = len(data)
+    q, r = divmod(n, groups)
+    group_sizes = np.full(groups, q)
+    group_sizes[:r] += 1
+
+    # Greedy start: deal students sorted by strata round the groups
+    member = np.empty(n, dtype=np.int64)
+    member[np.lexsort(codes.T[::-1])] = np.arange(n) % groups
+
+    # dev[g, cell] = students of that attribute value in g minus the
+    # proportional target for a group of g's size
+    cells = codes + offsets
+    totals = np.zeros(widths.sum())
+    np.add.at(totals, cells.ravel(), 1)
+    dev = np.zeros((groups, widths.sum()))
+    np.add.at(dev, (np.repeat(member, len(names)), cells.ravel()), 1)
+    dev -= np.outer(group_sizes, totals) / max(n, 1)
+
+    rng = np.random.default_rng(seed)
+    batch = min(max(16 * groups, 4096), 65536)
+    idle = 0
+    for _ in range(max_rounds if groups > 1 else 0):
+        cand_a, cand_b = _improving_swaps(codes, offsets, member, dev, batch, rng)
+        idle = 0 if len(cand_a) else idle + 1
+        if idle == patience:
+            break
+        # Apply the best swaps whose groups are not touched twice this round
+        used = set()
+        for a, b in zip(cand_a.tolist(), cand_b.tolist()):
+            g, h = member[a], member[b]
+            if g in used or h in used:
+                continue
+            used.update((g, h))
+            dev[g, cells[a]] -= 1
+            dev[g, cells[b]] += 1
+            dev[h, cells[b]] -= 1
+            dev[h, cells[a]] += 1
+            member[a], member[b] = h, g
+
+    grouped = data.iloc[np.argsort(member, kind="stable")]
+    bounds = np.concatenate(([0], np.cumsum(group_sizes)))
+    files = save_groups("stratified", {
+        f"stratified_group_{i + 1}.csv": grouped.iloc[bounds[i]: bounds[i + 1]]
+        for i in range(groups)
+    }, output_dir)
+
+    # Build stats summary with per-group deviation columns
+    labels = [f"G{i}" for i in range(1, groups + 1)]
+    group_col = pd.Categorical.from_codes(member, categories=labels)
+    stats_table = pd.crosstab(group_col, data["dept"].to_numpy(), dropna=False)
+    stats_table = stats_table.reindex(index=labels, columns=data["dept"].unique().tolist(), fill_value=0)
+    stats_table.index.name = None
+    stats_table.columns.name = None
+    stats_table["Total"] = stats_table.sum(axis=1)
+
+    for column, values in _balance_columns(data, member, groups, names, bands).items():
+        stats_table[column] = values
+
+    stats_name = "stratified_stats.csv"
+    stats_bytes = save_csv(stats_table.reset_index(), stats_name, output_dir)
+    return files, (stats_name, stats_bytes, stats_table)
+
+
+# Incremental Maintenance
+
+STATS_NAMES = {
+    "mix": "round_robin_stats.csv",
+    "balanced": "balanced_stats.csv",
+    "stratified": "stratified_stats.csv",
+}
+
+
+def load_assignment(prefix: str, output_dir=OUTPUT_DIR, files=None) -> pd.DataFrame:
+    """
+    Read the group files of a previous run back into one frame.
+
+    Args:
+        prefix (str): File prefix of the run, e.g. "balanced" or "mix".
+        output_dir (str | Path): Folder holding the group CSV files.
+        files (dict | None): The run's own files (filename → CSV bytes or
+            path), e.g. what a grouping function returned. When given,
+            ``output_dir`` is not read, so files of other runs that share
+            the folder can never be merged in.
+
+    Returns:
+        pd.DataFrame: All students with a 1-based 'Group' column; the
+            number of groups is kept in ``attrs["groups"]`` so groups that
+            end up empty still count.
+    """
+    if files is None:
+        files = {path.name: path for path in Path(output_dir).glob(f"{prefix}_group_*.csv")}
+    frames = []
+    for fname, content in files.items():
+        stem = Path(fname).stem
+        if not stem.startswith(f"{prefix}_group_"):
+            continue
+        source = content if isinstance(content, Path) else BytesIO(content)
+        frames.append(pd.read_csv(source, dtype={"Roll": str}).assign(Group=int(stem.rsplit("_", 1)[1])))
+    if not frames:
+        raise FileNotFoundError(f"No {prefix}_group_*.csv files in {output_dir}")
+    assignment = pd.concat(frames, ignore_index=True).sort_values("Group", kind="stable")
+    assignment.attrs["groups"] = len(frames)
+    return assignment
+
+
+def update_groups(
+    previous: pd.DataFrame,
+    added=None,
+    removed=(),
+    prefix: str = "balanced",
+    output_dir=OUTPUT_DIR,
+    attributes=(),
+    bands: int = 4,
+):
+    """
+    Apply late adds/drops to an existing assignment with minimal moves.
+
+    Logic:
+        - Removed rolls are dropped from their groups; rolls that are not
+          in any group are reported back.
+        - Added rolls already in a group (or repeated in ``added``) are
+          skipped and reported back.
+        - Each added student joins the smallest group, preferring the one
+          with the fewest students of their department.
+        - While group sizes spread more than before (at least ±1), one
+          student moves from the largest to the smallest group, choosing
+          the department most over-represented there relative to the target.
+        - Only group files whose membership changed are rewritten.
+
+    Args:
+        previous (pd.DataFrame): Assignment with a 'Group' column (see ``load_assignment``).
+        added (pd.DataFrame | None): Roster rows of students to add.
+        removed (iterable): Roll numbers to drop.
+        prefix (str): File prefix of the run, e.g. "balanced" or "mix".
+        output_dir (str | Path): Folder holding the group CSV files.
+        attributes (sequence): For a stratified run, the attributes it was
+            balanced on, so the stats keep their dev_/mean_ columns.
+        bands (int): Quantile bands for numeric attributes, as in ``stratified_split``.
+
+    Returns:
+        pd.DataFrame: Updated assignment.
+        dict: Rewritten group CSVs (changed groups only).
+        tuple: (stats filename, stats CSV bytes, stats DataFrame)
+        dict: Rolls that were ignored: "not_found" (removals) and
+            "already_assigned" (additions).
+    """
+    groups = int(previous.attrs.get("groups", previous["Group"].max()))
+    sizes_before = np.bincount(previous["Group"], minlength=groups + 1)[1:]
+    allowed_spread = max(1, int(sizes_before.max() - sizes_before.min()))
+
+    removed = set(map(str, removed))
+    rolls = previous["Roll"].astype(str)
+    dropped = rolls.isin(removed)
+    skipped = {"not_found": sorted(removed - set(rolls[dropped])), "already_assigned": []}
+    changed = set(previous.loc[dropped, "Group"].tolist())
+    current = previous[~dropped].copy()
+    current["dept"] = current["Roll"].astype(str).str[4:6]
+
+    columns = [c for c in previous.columns if c != "Group"]
+    if added is not None and len(added):
+        added_rolls = added["Roll"].astype(str)
+        repeated = added_rolls.isin(set(current["Roll"].astype(str))) | added_rolls.duplicated()
+        skipped["already_assigned"] = added_rolls[repeated].tolist()
+        added = added[~repeated.to_numpy()]
+    if added is not None and len(added):
+        newcomers = prepare_roster(added)
+        newcomers = newcomers.assign(dept=newcomers["dept"].astype(str)).reindex(columns=current.columns)
+        newcomers["Group"] = 0
+        current = pd.concat([current, newcomers], ignore_index=True)
+
+    # Per-group sizes and department counts, updated as students are placed
+    depts = current["dept"].unique().tolist()
+    known = current["Group"] > 0
+    counts = pd.crosstab(current.loc[known, "Group"], current.loc[known, "dept"])
+    counts = counts.reindex(index=range(1, groups + 1), columns=depts, fill_value=0)
+    table = counts.to_numpy(copy=True)
+    dept_idx = {d: i for i, d in enumerate(depts)}
+    group_of = current["Group"].to_numpy(copy=True)
+    dept_of = current["dept"].map(dept_idx).to_numpy()
+
+    for row in np.flatnonzero(group_of == 0):
+        sizes = table.sum(axis=1)
+        smallest = np.flatnonzero(sizes == sizes.min())
+        target = smallest[np.argmin(table[smallest, dept_of[row]])]
+        table[target, dept_of[row]] += 1
+        group_of[row] = target + 1
+        changed.add(target + 1)
+
+    # Restore the size invariant with the fewest single-student moves
+    share = table.sum(axis=0) / max(len(group_of), 1)
+    while True:
+        sizes = table.sum(axis=1)
+        src, dst = int(np.argmax(sizes)), int(np.argmin(sizes))
+        if sizes[src] - sizes[dst] <= allowed_spread:
+            break
+        excess = (table[src] - share * sizes[src]) - (table[dst] - share * sizes[dst])
+        excess[table[src] == 0] = -np.inf
+        dept = int(np.argmax(excess))
+        row = np.flatnonzero((group_of == src + 1) & (dept_of == dept))[-1]
+        table[src, dept] -= 1
+        table[dst, dept] += 1
+        group_of[row] = dst + 1
+        changed.update((src + 1, dst + 1))
+
+    current["Group"] = group_of
+    files = save_csv_batch({
+        f"{prefix}_group_{g}.csv": current.loc[current["Group"] == g, columns]
+        for g in sorted(changed)
+    }, output_dir)
+
+    stats_table = pd.DataFrame(table, index=[f"G{g}" for g in range(1, groups + 1)], columns=depts)
+    stats_table["Total"] = stats_table.sum(axis=1)
+    if prefix == "stratified":
+        names = ["dept"] + [a for a in attributes if a != "dept"]
+        for column, values in _balance_columns(current, group_of - 1, groups, names, bands).items():
+            stats_table[column] = values
+    stats_name = STATS_NAMES.get(prefix, f"{prefix}_stats.csv")
+    stats_bytes = save_csv(stats_table.reset_index(), stats_name, output_dir)
+    return current, files, (stats_name, stats_bytes, stats_table), skipped
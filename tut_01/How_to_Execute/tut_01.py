@@ -1,188 +1,73 @@
 import streamlit as st
 import pandas as pd
-import math
+import hashlib
+from io import BytesIO
 from pathlib import Path
 
+from grouping import (
+    balanced_split,
+    build_archive,
+    distribute_round_robin,
+    export_branchwise,
+    export_branchwise_chunked,
+    load_assignment,
+    read_roster,
+    save_csv,
+    save_csv_batch,
+    save_groups,
+    stratified_split,
+    update_groups,
+)
+
+# Group files land here, relative to where `streamlit run` is started
+OUTPUT_DIR = Path("output")
 
-# File Handling Utilities
+# Group file prefix of each mode that supports late adds/drops
+GROUP_PREFIXES = {"Round Robin Mix": "mix", "Balanced Split": "balanced", "Stratified Split": "stratified"}
 
-OUTPUT_DIR = Path("output")
-OUTPUT_DIR.mkdir(exist_ok=True)
-
-def save_csv(df: pd.DataFrame, filename: str) -> bytes:
-    """
-    Save a DataFrame both to disk and return a downloadable CSV in memory.
-
-    Args:
-        df (pd.DataFrame): The DataFrame to save.
-        filename (str): Desired output file name.
-
-    Returns:
-        bytes: Encoded CSV content for Streamlit download button.
-    """
-    path = OUTPUT_DIR / filename
-    df.to_csv(path, index=False)
-    return df.to_csv(index=False).encode("utf-8")
-
-
-
-#  Grouping Functions
-
-def export_branchwise(df: pd.DataFrame):
-    """
-    Export students into separate CSV files grouped by branch.
-
-    Args:
-        df (pd.DataFrame): Input dataset containing a 'Roll' column.
-
-    Returns:
-        dict: Mapping of filenames → CSV bytes for download.
-        None: Placeholder since no stats are generated here.
-    """
-    cleaned = df.drop(columns=["Unnamed: 3", "Unique"], errors="ignore")
-    cleaned["branch"] = cleaned["Roll"].astype(str).str[4:6]
-
-
-    results = {}
-    for branch, block in cleaned.groupby("branch"):
-        fname = f"branch_{branch}.csv"
-        results[fname] = save_csv(block, fname)
-    return results, None
-
-
-def distribute_round_robin(df: pd.DataFrame, groups: int):
-    """
-    Interleave students from each department into a fixed number of groups.
-
-    Logic:
-        - Each department list is traversed in order.
-        - Students are assigned in a round-robin fashion.
-        - Groups are filled until desired size is reached.
-
-    Args:
-        df (pd.DataFrame): Input dataset with Roll numbers.
-        groups (int): Number of groups to generate.
-
-    Returns:
-        dict: Generated group CSVs.
-        tuple: (stats filename, stats CSV bytes, stats DataFrame)
-    """
-    base = df.drop(columns=["Unnamed: 3", "Unique"], errors="ignore")
-    base["dept"] = base["Roll"].astype(str).str[4:6]
-
-    # Split into pools by department
-    sequence = list(dict.fromkeys(base["dept"]))
-    pools = {d: base[base["dept"] == d].reset_index(drop=True) for d in sequence}
-    positions = {d: 0 for d in sequence}
-
-    group_size = math.ceil(len(base) / groups)
-    containers = [[] for _ in range(groups)]
-
-    for g in range(groups):
-        while len(containers[g]) < group_size:
-            inserted = False
-            for d in sequence:
-                if positions[d] < len(pools[d]):
-                    containers[g].append(pools[d].iloc[positions[d]].to_dict())
-                    positions[d] += 1
-                    inserted = True
-                    if len(containers[g]) >= group_size:
-                        break
-            if not inserted:
-                break
-
-    # Build DataFrames for each group
-    final = [pd.DataFrame(chunk) for chunk in containers if chunk]
-
-    files = {}
-    for i, gdf in enumerate(final, 1):
-        fname = f"mix_group_{i}.csv"
-        files[fname] = save_csv(gdf, fname)
-
-    # Create department count stats
-    summary = []
-    for i, gdf in enumerate(final, 1):
-        counts = gdf["dept"].value_counts().to_dict()
-        counts["Group"] = f"G{i}"
-        summary.append(counts)
-
-    stats = pd.DataFrame(summary).fillna(0).set_index("Group")
-    stats["Total"] = stats.sum(axis=1)
-
-    stats_name = "round_robin_stats.csv"
-    stats_bytes = save_csv(stats.reset_index(), stats_name)
-    return files, (stats_name, stats_bytes, stats)
-
-
-def balanced_split(df: pd.DataFrame, groups: int):
-    """
-    Distribute students across groups such that sizes are as balanced as possible.
-
-    Method:
-        - Sort departments by size.
-        - Allocate slices of each department to groups sequentially.
-        - Ensure remainder distribution keeps groups balanced.
-
-    Args:
-        df (pd.DataFrame): Dataset with Roll numbers.
-        groups (int): Number of groups.
-
-    Returns:
-        dict: Generated CSVs for each group.
-        tuple: (stats filename, stats CSV bytes, stats DataFrame)
-    """
-    data = df.drop(columns=["Unnamed: 3", "Unique"], errors="ignore")
-    data["dept"] = data["Roll"].astype(str).str[4:6]
-
-    # Organize departments
-    counts = data["dept"].value_counts().to_dict()
-    ordered = sorted(counts, key=counts.get, reverse=True)
-    pools = {d: data[data["dept"] == d].reset_index(drop=True) for d in ordered}
-    pointers = {d: 0 for d in ordered}
-
-    # Pre-compute group sizes
-    q, r = divmod(len(data), groups)
-    group_sizes = [q + (1 if i < r else 0) for i in range(groups)]
-    groups_data = [[] for _ in range(groups)]
-
-    idx = 0
-    for dept in ordered:
-        while pointers[dept] < len(pools[dept]):
-            available = group_sizes[idx] - len(groups_data[idx])
-            remain = len(pools[dept]) - pointers[dept]
-            take = min(available, remain)
-
-            slice_df = pools[dept].iloc[pointers[dept]: pointers[dept] + take]
-            groups_data[idx].extend(slice_df.to_dict(orient="records"))
-            pointers[dept] += take
-
-            if len(groups_data[idx]) == group_sizes[idx]:
-                idx += 1
-                if idx == groups:
-                    break
-        if idx == groups:
-            break
-
-    final = [pd.DataFrame(chunk) for chunk in groups_data]
-
-    files = {}
-    for i, gdf in enumerate(final, 1):
-        fname = f"balanced_group_{i}.csv"
-        files[fname] = save_csv(gdf, fname)
-
-    # Build stats summary
-    dept_list = data["dept"].unique().tolist()
-    stats_table = pd.DataFrame(0, index=[f"G{i}" for i in range(1, groups + 1)], columns=dept_list)
-
-    for i, gdf in enumerate(final, 1):
-        counts = gdf["dept"].value_counts()
-        stats_table.loc[f"G{i}", counts.index] = counts.values
-
-    stats_table["Total"] = stats_table.sum(axis=1)
-
-    stats_name = "balanced_stats.csv"
-    stats_bytes = save_csv(stats_table.reset_index(), stats_name)
-    return files, (stats_name, stats_bytes, stats_table)
+
+# =============================
+# ⚡ Cached Loading & Grouping
+# =============================
+# Streamlit reruns this script on every widget interaction. Parsed uploads
+# and grouping outputs are cached by the SHA-256 of the uploaded bytes, so
+# toggling widgets or re-downloading never re-parses or regroups. Both
+# caches are bounded and evict least-recently-used entries.
+# Only the computation is cached: every Generate click writes the run's
+# bytes to OUTPUT_DIR, so the folder always holds what the page shows.
+
+def content_digest(content: bytes) -> str:
+    """Return the hex SHA-256 digest used as the cache key for an upload."""
+    return hashlib.sha256(content).hexdigest()
+
+
+@st.cache_data(max_entries=4, show_spinner="Parsing roster...")
+def load_dataset(digest: str, name: str, _content: bytes) -> pd.DataFrame:
+    """Parse an uploaded CSV/Excel file; cached on ``digest`` only."""
+    return read_roster(BytesIO(_content), name)
+
+
+@st.cache_data(max_entries=16, show_spinner="Generating groups...")
+def run_grouping(digest: str, name: str, option: str, groups, _content: bytes, attributes=()):
+    """Compute one grouping mode without writing; cached on (digest, mode, number of groups, attributes)."""
+    df = load_dataset(digest, name, _content)
+    if option == "Branch Export":
+        return export_branchwise(df, None)
+    if option == "Round Robin Mix":
+        return distribute_round_robin(df, int(groups), None)
+    if option == "Stratified Split":
+        return stratified_split(df, int(groups), attributes, None)
+    return balanced_split(df, int(groups), None)
+
+
+def write_run(option: str, files: dict, stats) -> None:
+    """Write a computed run's CSV bytes to OUTPUT_DIR, replacing older group files of that mode."""
+    if option in GROUP_PREFIXES:
+        save_groups(GROUP_PREFIXES[option], files, OUTPUT_DIR)
+    else:
+        save_csv_batch(files, OUTPUT_DIR)
+    if stats:
+        save_csv(stats[1], stats[0], OUTPUT_DIR)
 
 
 # =============================
@@ -194,37 +79,81 @@ file = st.file_uploader("Upload your CSV/Excel file", type=["csv", "xlsx"])
 
 if file:
     # Load dataset preview
-    df = pd.read_csv(file) if file.name.endswith("csv") else pd.read_excel(file)
+    raw = file.getvalue()
+    digest = content_digest(raw)
+    df = load_dataset(digest, file.name, raw)
     st.subheader("Preview")
     st.dataframe(df.head())
 
     # User choice of grouping method
     option = st.radio(
         "Select grouping mode:",
-        ("Branch Export", "Round Robin Mix", "Balanced Split")
+        ("Branch Export", "Round Robin Mix", "Balanced Split", "Stratified Split")
     )
 
     groups = None
-    if option in ["Round Robin Mix", "Balanced Split"]:
-        groups = st.number_input("Number of groups", min_value=1, step=1)
-
+    attributes = ()
+    if option in ["Round Robin Mix", "Balanced Split", "Stratified Split"]:
+        groups = int(st.number_input("Number of groups", min_value=1, step=1))
+    prefix = GROUP_PREFIXES.get(option)
+    if option == "Stratified Split":
+        attributes = tuple(st.multiselect(
+            "Also balance on (department is always balanced):",
+            [c for c in df.columns if c not in ("Roll", "Name", "Email", "dept")],
+            help="Numeric columns such as CGPA are balanced by quantile band."
+        ))
+    elif option == "Branch Export" and file.name.endswith("csv") and st.checkbox(
+        "Stream to disk in chunks (very large rosters)",
+        help="Writes branch files straight to the output folder; memory stays bounded by the chunk size."
+    ):
+        option = "Branch Export (streamed)"
+
+    # Remember the last generated request so download reruns keep showing it.
+    # Late adds/drops are kept next to it in session state; a fresh Generate
+    # discards them and writes the original run back to the output folder.
+    # The streamed export writes while it reads, so it runs on Generate only.
+    run_key = (digest, option, groups, attributes)
     if st.button("Generate Groups"):
-        if option == "Branch Export":
-            files, stats = export_branchwise(df)
-        elif option == "Round Robin Mix":
-            files, stats = distribute_round_robin(df, int(groups))
+        st.session_state["last_run"] = run_key
+        st.session_state.pop("updated_run", None)
+        if option == "Branch Export (streamed)":
+            st.session_state["streamed_run"] = export_branchwise_chunked(BytesIO(raw), OUTPUT_DIR)
+        else:
+            write_run(option, *run_grouping(digest, file.name, option, groups, raw, attributes))
+
+    if st.session_state.get("last_run") == run_key:
+        updated = st.session_state.get("updated_run")
+        if updated and updated["key"] == run_key:
+            files, stats = updated["files"], updated["stats"]
+        elif option == "Branch Export (streamed)":
+            files, stats = st.session_state["streamed_run"]
         else:
-            files, stats = balanced_split(df, int(groups))
+            files, stats = run_grouping(digest, file.name, option, groups, raw, attributes)
 
         # File download section
         st.subheader("📥 Download Files")
-        for fname, content in files.items():
+        delivery = st.radio(
+            "Download as:",
+            ("Single ZIP archive", "Individual files"),
+            horizontal=True,
+        )
+        if delivery == "Single ZIP archive":
+            # The archive is only built when the button is clicked, so the page
+            # does not ship one payload per group on every render.
             st.download_button(
-                label=f"Download {fname}",
-                data=content,
-                file_name=fname,
-                mime="text/csv"
+                label=f"Download all {len(files)} files (.zip)",
+                data=lambda: build_archive(files, stats),
+                file_name=f"{option.split(' (')[0].lower().replace(' ', '_')}_groups.zip",
+                mime="application/zip"
             )
+        else:
+            for fname, content in files.items():
+                st.download_button(
+                    label=f"Download {fname}",
+                    data=content.read_bytes if isinstance(content, Path) else content,
+                    file_name=fname,
+                    mime="text/csv"
+                )
 
         # Stats download section
         if stats:
@@ -237,3 +166,33 @@ if file:
                 file_name=sname,
                 mime="text/csv"
             )
+
+        # Late adds/drops against the groups shown above; only the changed
+        # group files are rewritten
+        if prefix:
+            with st.expander("🔁 Late adds / drops (update existing groups)", expanded=bool(updated)):
+                if updated and updated["key"] == run_key:
+                    for level, note in updated["notes"]:
+                        getattr(st, level)(note)
+                added_file = st.file_uploader("Roster of students to add", type=["csv", "xlsx"], key="added")
+                removed_text = st.text_area("Roll numbers to remove (one per line or comma separated)")
+                if st.button("Apply changes"):
+                    try:
+                        previous = load_assignment(prefix, files=files)
+                    except FileNotFoundError as exc:
+                        st.error(str(exc))
+                    else:
+                        added = read_roster(added_file, added_file.name) if added_file else None
+                        removed = [r.strip() for r in removed_text.replace(",", "\n").splitlines() if r.strip()]
+                        _, changed, stats, skipped = update_groups(
+                            previous, added, removed, prefix, OUTPUT_DIR, attributes
+                        )
+                        notes = [("success", f"Rewrote {len(changed)} group file(s): {', '.join(changed) or 'none'}")]
+                        if skipped["not_found"]:
+                            notes.append(("warning", f"Not in any group: {', '.join(skipped['not_found'])}"))
+                        if skipped["already_assigned"]:
+                            notes.append(("warning", f"Already assigned, not added again: {', '.join(skipped['already_assigned'])}"))
+                        st.session_state["updated_run"] = {
+                            "key": run_key, "files": {**files, **changed}, "stats": stats, "notes": notes,
+                        }
+                        st.rerun()